@@ -1,10 +1,14 @@
 import asyncio
 import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 import bibtexparser
 from pathlib import Path
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
+from src.seguimiento1.bib_stream import iter_bib_entries
+from src.seguimiento1.author_index import entry_record, update_author_index
+from src.automatizacion.duplicados import NearDuplicateIndex
 
 
 # =========================
@@ -187,11 +191,9 @@ async def login_google_account():
         await browser.close()
 
 
-def merge_bib_files(base_dir="descargas", output_file="descargas/unificado.bib", repetidos_file="descargas/repetidos.bib"):
-    entradas_unicas = []
-    entradas_repetidas = []
-    titulos_vistos = set()
-
+def list_bib_files(base_dir="descargas"):
+    """Rutas de las páginas descargadas, en el orden en que se unifican."""
+    rutas = []
     for db in ["ieee", "science_direct"]:
         folder = os.path.join(base_dir, db)
         if not os.path.exists(folder):
@@ -199,17 +201,45 @@ def merge_bib_files(base_dir="descargas", output_file="descargas/unificado.bib",
 
         for file in os.listdir(folder):
             if file.endswith(".bib"):
-                ruta = os.path.join(folder, file)
-                with open(ruta, encoding="utf-8") as bibtex_file:
-                    bib_database = bibtexparser.load(bibtex_file)
-
-                for entry in bib_database.entries:
-                    title = entry.get("title", "").strip().lower()
-                    if title in titulos_vistos:
-                        entradas_repetidas.append(entry)
-                    else:
-                        titulos_vistos.add(title)
-                        entradas_unicas.append(entry)
+                rutas.append(os.path.join(folder, file))
+    return rutas
+
+
+def parse_bib_file(ruta):
+    """Lee una página completa; se ejecuta dentro de un proceso del pool."""
+    return list(iter_bib_entries(ruta))
+
+
+def iter_merge_entries(rutas, workers=1):
+    """
+    Entradas de todas las páginas en el orden de rutas.
+    Con workers > 1 las páginas se leen en paralelo en un pool de procesos, pero
+    pool.map entrega los resultados en el orden original, así que la unificación
+    queda idéntica a la lectura secuencial.
+    """
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for entries in pool.map(parse_bib_file, rutas):
+                yield from entries
+    else:
+        for ruta in rutas:
+            # Se lee entrada por entrada, sin cargar la página completa
+            yield from iter_bib_entries(ruta)
+
+
+def merge_bib_files(base_dir="descargas", output_file="descargas/unificado.bib", repetidos_file="descargas/repetidos.bib", workers=1, similarity_threshold=0.9):
+    entradas_unicas = []
+    entradas_repetidas = []
+    indice = NearDuplicateIndex(threshold=similarity_threshold)
+
+    for entry in iter_merge_entries(list_bib_files(base_dir), workers):
+        original_id, similitud = indice.find(entry)
+        if original_id is not None:
+            # En repetidos.bib queda registrado con qué entrada se unificó
+            entradas_repetidas.append(dict(entry, duplicado_de=original_id, similitud=f"{similitud:.3f}"))
+        else:
+            indice.add(entry)
+            entradas_unicas.append(entry)
 
     db_unicos = bibtexparser.bibdatabase.BibDatabase()
     db_unicos.entries = entradas_unicas
@@ -225,7 +255,11 @@ def merge_bib_files(base_dir="descargas", output_file="descargas/unificado.bib",
         with open(repetidos_file, "w", encoding="utf-8") as f:
             f.write(writer.write(db_repes))
 
+    # Índice de autores (output_file + ".autores"): solo se suman/restan las entradas que cambiaron
+    indice_autores, agregadas, quitadas = update_author_index(output_file, map(entry_record, entradas_unicas))
+
     print(f"✅ Archivo unificado: {output_file}")
+    print(f"👥 Índice de autores: {agregadas} entradas agregadas, {quitadas} quitadas ({len(indice_autores)} autores)")
     print(f"⚠️ Repetidos encontrados: {len(entradas_repetidas)} (guardados en {repetidos_file})")
 
 
@@ -234,7 +268,7 @@ async def main():
     #await login_google_account()
     #await download_from_science_direct()
     await download_from_ieee()
-    merge_bib_files(base_dir="descargas", output_file="descargas/unificado.bib", repetidos_file="descargas/repetidos.bib")
+    merge_bib_files(base_dir="descargas", output_file="descargas/unificado.bib", repetidos_file="descargas/repetidos.bib", workers=os.cpu_count())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+import re
+import zlib
+import numpy as np
+from src.seguimiento1.sort_keys import normalize
+
+
+# =========================
+#  Detección de casi-duplicados (MinHash + LSH)
+# =========================
+# Cada título se normaliza (sin LaTeX, tildes ni puntuación) y se parte en
+# shingles de caracteres. La firma MinHash se divide en bandas; dos entradas
+# solo se comparan si coinciden en alguna banda, así que el costo crece casi
+# linealmente con el corpus en lugar de comparar todos contra todos.
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD_RE = re.compile(r"[\W_]+")
+_DOI_PREFIX_RE = re.compile(r"^(?:https?://)?(?:dx\.)?(?:doi\.org/)?(?:doi:\s*)?", re.IGNORECASE)
+
+
+def normalize_title(title):
+    """Título comparable: minúsculas, sin LaTeX, tildes ni puntuación."""
+    return _NON_WORD_RE.sub(" ", normalize(title or "")).strip()
+
+
+def normalize_doi(doi):
+    """Quita el prefijo https://doi.org/ que agrega ScienceDirect y pasa a minúsculas."""
+    return _DOI_PREFIX_RE.sub("", (doi or "").strip()).lower()
+
+
+def shingles(text, size=5):
+    """Conjunto de hashes (crc32) de los shingles de caracteres del texto."""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {zlib.crc32(text[i:i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    Índice incremental de entradas ya aceptadas. Solo guarda columnas compactas
+    (ID, DOI y shingles del título), no las entradas completas.
+    find() busca si una entrada es duplicado de alguna anterior y add() la registra.
+    Orden de verificación: DOI, título normalizado idéntico y luego MinHash/LSH
+    con verificación exacta de Jaccard sobre los candidatos.
+    """
+
+    def __init__(self, threshold=0.9, num_perm=128, bands=16, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Permutaciones h(x) = (a*x + b) mod p; con p < 2^31 no hay overflow en uint64
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self._ids = []
+        self._dois = []
+        self._shingles = []
+        self._by_doi = {}
+        self._by_title = {}
+        self._buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def signature(self, shingle_set):
+        values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        hashed = (values[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def _different_dois(self, doi, i):
+        """
+        True si hay doi, la entrada indexada i también tiene DOI y no coinciden: son
+        publicaciones diferentes aunque el título se parezca o sea el mismo.
+        """
+        other_doi = self._dois[i]
+        return bool(doi and other_doi and doi != other_doi)
+
+    def find(self, entry):
+        """
+        Devuelve (ID de la entrada original, similitud) si entry es duplicado de
+        algo ya indexado, o (None, 0.0) si es nueva.
+        """
+        doi = normalize_doi(entry.get("doi"))
+        if doi and doi in self._by_doi:
+            return self._ids[self._by_doi[doi]], 1.0
+
+        title = normalize_title(entry.get("title"))
+        if not title:
+            # Sin título no hay con qué comparar (ni DOI coincidente)
+            return None, 0.0
+        same_title = self._by_title.get(title)
+        if same_title is not None and not self._different_dois(doi, same_title):
+            return self._ids[same_title], 1.0
+
+        entry_shingles = shingles(title, self.shingle_size)
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(self.signature(entry_shingles))):
+            candidates.update(band.get(key, ()))
+
+        # En caso de empate gana la entrada indexada primero (resultado determinista)
+        best, best_score = None, 0.0
+        for i in sorted(candidates):
+            if self._different_dois(doi, i):
+                continue
+            score = jaccard(entry_shingles, self._shingles[i])
+            if score > best_score:
+                best, best_score = i, score
+        if best is not None and best_score >= self.threshold:
+            return self._ids[best], best_score
+        return None, 0.0
+
+    def add(self, entry):
+        """Registra una entrada aceptada como única."""
+        i = len(self._ids)
+        self._ids.append(entry.get("ID"))
+
+        doi = normalize_doi(entry.get("doi"))
+        self._dois.append(doi)
+        if doi:
+            self._by_doi.setdefault(doi, i)
+
+        title = normalize_title(entry.get("title"))
+        entry_shingles = shingles(title, self.shingle_size) if title else set()
+        self._shingles.append(entry_shingles)
+        if not title:
+            return
+        self._by_title.setdefault(title, i)
+        for band, key in zip(self._buckets, self._band_keys(self.signature(entry_shingles))):
+            band.setdefault(key, []).append(i)
@@ -0,0 +1,139 @@
+import heapq
+import os
+import pickle
+from collections import Counter
+
+
+# ---------------- Índice persistente de autores ----------------
+# Guarda junto al .bib (unificado.bib -> unificado.bib.autores) cuántas veces
+# aparece cada autor normalizado, para que top_authors responda el top N sin
+# volver a leer el .bib ni a contar desde cero.
+# Cada entrada se registra como (ID, autores normalizados); el índice guarda el
+# multiconjunto de esos registros (hay IDs repetidos entre bases). merge_bib_files
+# lo actualiza después de cada unificación: cada entrada del resultado se busca
+# en el índice (una consulta al dict, la unificación ya recorre todas) y los
+# conteos de autores solo se tocan para las entradas agregadas o quitadas; no se
+# vuelve a contar el corpus. El top N sale de un heap de tamaño N: O(autores · log N).
+# Este módulo solo usa la biblioteca estándar: lo importan tanto seguimiento1
+# como automatizacion.
+
+INDEX_SUFFIX = ".autores"
+INDEX_VERSION = 1
+
+
+def normalize_author(name):
+    """Convertir a minúsculas y quitar espacios extra para uniformizar nombres."""
+    return " ".join(name.lower().strip().split())
+
+
+def entry_record(entry):
+    """(ID, autores normalizados) de una entrada; mismo criterio de separación que el corpus."""
+    authors = entry["author"].split(" and ") if "author" in entry else []
+    return entry.get("ID", ""), tuple(normalize_author(a) for a in authors)
+
+
+def top_k(counts, k):
+    """Los k autores con más apariciones (desempate alfabético), con un heap de tamaño k."""
+    return heapq.nsmallest(k, counts.items(), key=lambda x: (-x[1], x[0]))
+
+
+def index_path(bib_file):
+    return bib_file + INDEX_SUFFIX
+
+
+def source_stamp(bib_file):
+    """(tamaño, mtime) del .bib: si cambia, el índice puede estar desactualizado."""
+    stat = os.stat(bib_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class AuthorIndex:
+    def __init__(self):
+        self.counts = Counter()   # autor normalizado -> apariciones
+        self.records = Counter()  # (ID, autores) -> veces que está en el corpus
+        self.source = None        # source_stamp del .bib con el que se sincronizó
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add_record(self, record, times=1):
+        self.records[record] += times
+        for author in record[1]:
+            self.counts[author] += times
+
+    def remove_record(self, record, times=1):
+        times = min(times, self.records[record])
+        if not times:
+            return
+        self.records[record] -= times
+        if not self.records[record]:
+            del self.records[record]
+        for author in record[1]:
+            self.counts[author] -= times
+            if self.counts[author] <= 0:
+                del self.counts[author]
+
+    def sync(self, records):
+        """
+        Deja el índice igual a `records` (los registros de todas las entradas del
+        .bib nuevo): los que no estaban se suman y los que ya no aparecen se
+        restan; los conteos de autores solo cambian por esos.
+        Devuelve (registros agregados, registros quitados).
+        """
+        unmatched = dict(self.records)  # los que todavía no aparecieron en records
+        added = 0
+        for record in records:
+            times = unmatched.get(record)
+            if times:
+                if times == 1:
+                    del unmatched[record]
+                else:
+                    unmatched[record] = times - 1
+            else:
+                self.add_record(record)
+                added += 1
+        for record, times in unmatched.items():
+            self.remove_record(record, times)
+        return added, sum(unmatched.values())
+
+    def top(self, k):
+        return top_k(self.counts, k)
+
+    # ---------- Persistencia ----------
+    def save(self, path):
+        # Escritura atómica, igual que la caché del corpus
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "source": self.source, "records": dict(self.records)},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carga el índice guardado; si no existe o es de otra versión, devuelve uno vacío."""
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return index
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return index
+        for record, times in data["records"].items():
+            index.add_record(record, times)
+        index.source = data["source"]
+        return index
+
+
+def update_author_index(bib_file, records):
+    """
+    Sincroniza el índice de bib_file con los registros (ID, autores) de sus entradas
+    y lo guarda. Se llama después de escribir bib_file.
+    Devuelve (índice, agregados, quitados).
+    """
+    path = index_path(bib_file)
+    index = AuthorIndex.load(path)
+    added, removed = index.sync(records)
+    index.source = source_stamp(bib_file)
+    index.save(path)
+    return index, added, removed
@@ -0,0 +1,194 @@
+import os
+import pickle
+import re
+from collections import Counter, defaultdict
+from sort_keys import normalize
+
+
+# ---------------- Nombres canónicos de autor ----------------
+# normalize_author solo pasa a minúsculas, así que "Zhang, Jing", "J. Zhang" y
+# "Jing Zhang" se cuentan como tres autores. Aquí cada nombre se separa en
+# apellido y nombres (formato "Apellido, Nombres" de ScienceDirect, "Nombres
+# Apellido" de IEEE, apellidos compuestos entre llaves como "david {van dijk}"),
+# sin LaTeX ni tildes, y se agrupan las variantes:
+#   - los candidatos se bloquean por apellido (solo letras): cada nombre se
+#     compara únicamente con los de su mismo apellido, así el costo es casi lineal
+#   - dentro del bloque, las formas con el mismo primer nombre completo son una
+#     misma persona ("jing zhang", "zhang, jing", "jing w. zhang")
+#   - una forma con iniciales ("j. zhang") se une al único grupo compatible; si
+#     hay más de uno ("jing" y "jun") es ambigua y queda aparte
+# El nombre canónico del grupo es su forma completa más frecuente, como
+# "apellido, nombres". El mapa alias -> canónico se guarda junto al .bib
+# (unificado.bib -> unificado.bib.alias) con los conteos con los que se armó, y
+# se reutiliza solo mientras esos conteos no cambien (la forma más frecuente de
+# cada grupo depende de ellos).
+
+ALIAS_SUFFIX = ".alias"
+ALIAS_VERSION = 2
+
+PARTICLES = {"van", "von", "der", "den", "ter", "de", "del", "della", "la", "le", "du", "des",
+             "di", "da", "dos", "das"}
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+EMPTY_NAMES = {"", "others", "et al", "anonymous"}
+
+_LATEX_ACCENT_RE = re.compile(r"\\[\'`^\"~=.]")  # \"o, \'e: normalize solo quita comandos con letras
+_LATEX_DOTLESS_RE = re.compile(r"\\([ij])(?![a-zA-Z])")  # \i, \j (i y j sin punto): normalize los borraría
+_BRACED_TAIL_RE = re.compile(r"\{([^{}]*)\}\s*$")
+_GIVEN_SPLIT_RE = re.compile(r"[\s.\-]+")
+_NON_LETTER_RE = re.compile(r"[\W\d_]+")
+
+
+def _clean(text):
+    """Sin LaTeX ni tildes, minúsculas y espacios colapsados."""
+    text = _LATEX_DOTLESS_RE.sub(r"\1", _LATEX_ACCENT_RE.sub("", text))
+    return " ".join(normalize(text).split())
+
+
+def _is_suffix(token):
+    return _NON_LETTER_RE.sub("", _clean(token)) in SUFFIXES
+
+
+def _strip_suffixes(tokens):
+    """Quita los sufijos del final ("Smith Jr." -> ["Smith"]), dejando al menos un token."""
+    while len(tokens) > 1 and _is_suffix(tokens[-1]):
+        tokens.pop()
+    return tokens
+
+
+def split_name(name):
+    """
+    (apellido, nombres) de un nombre de autor, o None si está vacío.
+    nombres es una tupla de tokens ("jing", "w"); las iniciales quedan de una letra.
+    """
+    name = name.strip()
+    if "," in name:
+        # "Apellido, Nombres" o, en BibTeX, "Apellido, Jr., Nombres"
+        parts = [part.strip() for part in name.split(",")]
+        if len(parts) > 2 and _is_suffix(parts[1]):
+            del parts[1]
+        surname = " ".join(_strip_suffixes(parts[0].split()))  # "Smith Jr., John"
+        given = "" if _is_suffix(parts[1]) else parts[1]        # "Smith, Jr."
+    else:
+        braced = _BRACED_TAIL_RE.search(name)
+        if braced:  # apellido compuesto entre llaves: "david {van dijk}"
+            surname, given = braced.group(1), name[:braced.start()]
+        else:
+            tokens = _strip_suffixes(name.split())  # "John Smith Jr." -> el apellido es Smith
+            if not tokens:
+                return None
+            cut = len(tokens) - 1
+            while cut > 1 and _clean(tokens[cut - 1]) in PARTICLES:
+                cut -= 1
+            surname, given = " ".join(tokens[cut:]), " ".join(tokens[:cut])
+
+    surname = _clean(surname)
+    given = tuple(t for t in (_NON_LETTER_RE.sub("", t) for t in _GIVEN_SPLIT_RE.split(_clean(given)))
+                  if t and t not in SUFFIXES)
+    if surname in EMPTY_NAMES or not _NON_LETTER_RE.sub("", surname):
+        return None
+    return surname, given
+
+
+def surname_key(surname):
+    """Clave de bloqueo: solo las letras del apellido ("o’dwyer" -> "odwyer")."""
+    return _NON_LETTER_RE.sub("", surname)
+
+
+def _token_compatible(a, b):
+    if len(a) == 1 or len(b) == 1:
+        return a[0] == b[0]
+    return a == b
+
+
+def compatible(given1, given2):
+    """Nombres compatibles token a token (una inicial coincide con el nombre que abrevia)."""
+    if not given1 or not given2:
+        return False
+    return all(_token_compatible(a, b) for a, b in zip(given1, given2))
+
+
+def render(surname, given):
+    """'apellido, nombres' con las iniciales terminadas en punto."""
+    if not given:
+        return surname
+    return f"{surname}, " + " ".join(t + "." if len(t) == 1 else t for t in given)
+
+
+def _resolve_block(forms):
+    """
+    forms: Counter {(apellido, nombres): apariciones} de un bloque.
+    Devuelve {forma: forma canónica}.
+    """
+    groups = defaultdict(Counter)  # primer nombre completo -> formas del grupo
+    initials = []
+    for form, count in forms.items():
+        given = form[1]
+        if given and len(given[0]) > 1:
+            groups[given[0]][form] += count
+        else:
+            initials.append(form)
+
+    canonical = {}
+    for first, members in groups.items():
+        # la forma más frecuente; a igualdad, la más completa y luego la alfabética
+        best = min(members, key=lambda f: (-members[f], -len(f[1]), f))
+        for form in members:
+            canonical[form] = best
+
+    for form in initials:
+        matches = [members for members in groups.values()
+                   if any(compatible(form[1], full[1]) for full in members)]
+        canonical[form] = canonical[next(iter(matches[0]))] if len(matches) == 1 else form
+    return canonical
+
+
+def build_aliases(names):
+    """
+    {alias: nombre canónico} para un iterable de nombres (o {nombre: apariciones}).
+    Los nombres vacíos ("", "others") no aparecen en el mapa.
+    """
+    counts = Counter(names) if not isinstance(names, dict) else names
+    parsed = {}
+    blocks = defaultdict(Counter)
+    for name, count in counts.items():
+        form = split_name(name)
+        if form is None:
+            continue
+        parsed[name] = form
+        blocks[surname_key(form[0])][form] += count
+
+    resolved = {}
+    for forms in blocks.values():
+        resolved.update(_resolve_block(forms))
+    return {name: render(*resolved[form]) for name, form in parsed.items()}
+
+
+# ---------------- Caché del mapa de alias ----------------
+def alias_path(bib_file):
+    return bib_file + ALIAS_SUFFIX
+
+
+def load_aliases(bib_file, names):
+    """
+    Mapa alias -> canónico para los nombres dados (un iterable o {nombre:
+    apariciones}, por ejemplo los conteos del índice de autores). Se reutiliza el
+    guardado solo si se armó con los mismos conteos; si cambió cualquier conteo
+    (o hay nombres nuevos) se recalcula con todos y se guarda.
+    """
+    counts = dict(names) if isinstance(names, dict) else dict(Counter(names))
+    path = alias_path(bib_file)
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        data = None
+    if isinstance(data, dict) and data.get("version") == ALIAS_VERSION and data["counts"] == counts:
+        return data["aliases"]
+
+    aliases = build_aliases(counts)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": ALIAS_VERSION, "counts": counts, "aliases": aliases},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return aliases
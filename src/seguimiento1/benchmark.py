@@ -1,56 +1,77 @@
-import time
+import statistics
 import matplotlib.pyplot as plt
-import bibtexparser
-from bibtexparser.bparser import BibTexParser
+from corpus_cache import load_corpus
+from benchmark_runner import DEFAULT_TIMEOUT, DEFAULT_MEMORY_LIMIT_MB, STATUS_OK, run_isolated, describe, time_algorithm
+from parallel_sort import speedup_report
 
 # Importa tus algoritmos (suponiendo que cada uno está en su archivo .py)
 from tim_sort import timsort
 from comb_sort import comb_sort
 from selection_sort import selection_sort
-from tree_sort import tree_sort
+from tree_sort import tree_sort, avl_tree_sort
 from pigeonhole_sort import pigeonhole_sort
 from bucket_sort import bucket_sort
 from quick_sort import quick_sort
 from heap_sort import heap_sort
-from bitonic_sort import bitonic_sort
+from bitonic_sort import bitonic_sort, bitonic_sort_numpy
 from gnome_sort import gnome_sort
 from binary_insertion_sort import binary_insertion_sort
 from radix_sort import radix_sort  # el counting sort
+from numpy_sort import numpy_sort  # referencia vectorizada (np.lexsort)
 # Si quieres, también podrías probar radix_sort_buckets
 
 # ---------- Utilidad ----------
 def get_entries(file_path):
-    parser = BibTexParser(common_strings=True)
-    with open(file_path, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
-    return bib_database.entries
+    # Filas livianas del corpus en columnas: solo la clave y el número de fila
+    return load_corpus(file_path).key_rows()
 
-def benchmark(entries):
-    algorithms = {
-        "TimSort": timsort,
-        "CombSort": comb_sort,
-        "SelectionSort": selection_sort,
-        "TreeSort": tree_sort,
-        "PigeonholeSort": pigeonhole_sort,
-        "BucketSort": bucket_sort,
-        "QuickSort": quick_sort,
-        "HeapSort": heap_sort,
-        "BitonicSort": bitonic_sort,
-        "GnomeSort": gnome_sort,
-        "BinaryInsertionSort": binary_insertion_sort,
-        "RadixSort": radix_sort,
-    }
+# ---------- Algoritmos registrados ----------
+ALGORITHMS = {
+    "NumPyLexsort": numpy_sort,  # referencia
+    "TimSort": timsort,
+    "CombSort": comb_sort,
+    "SelectionSort": selection_sort,
+    "TreeSort": tree_sort,
+    "AVLTreeSort": avl_tree_sort,
+    "PigeonholeSort": pigeonhole_sort,
+    "BucketSort": bucket_sort,
+    "QuickSort": quick_sort,
+    "HeapSort": heap_sort,
+    "BitonicSort": bitonic_sort,
+    "BitonicNumPy": bitonic_sort_numpy,
+    "GnomeSort": gnome_sort,
+    "BinaryInsertionSort": binary_insertion_sort,
+    "RadixSort": radix_sort,
+}
 
+def benchmark(entries, algorithms=ALGORITHMS, isolated=True, timeout=DEFAULT_TIMEOUT,
+              memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, workers=None):
+    """
+    Tiempo de cada algoritmo sobre entries. Con isolated=True cada algoritmo corre
+    en su propio proceso (en paralelo, con límite de tiempo y de memoria); los que
+    no terminan quedan fuera de results y se informan por consola.
+    """
     results = {}
 
-    for name, algo in algorithms.items():
-        data = entries.copy()
-        start = time.perf_counter()
-        algo(data)  # cada algoritmo devuelve lista ordenada
-        end = time.perf_counter()
-        elapsed = end - start
-        results[name] = elapsed
-        print(f"{name}: {elapsed:.6f} segundos")
+    if isolated:
+        outcomes = run_isolated(entries, algorithms, timeout=timeout,
+                                memory_limit_mb=memory_limit_mb, workers=workers)
+        for name, outcome in outcomes.items():
+            print(describe(name, len(entries), outcome))
+            if outcome["status"] == STATUS_OK:
+                results[name] = statistics.median(outcome["times"])
+    else:
+        for name, algo in algorithms.items():
+            # mismo helper (copia de la entrada, gc apagado) que en los procesos aislados
+            elapsed = time_algorithm(algo, entries)[0]
+            results[name] = elapsed
+            print(f"{name}: {elapsed:.6f} segundos")
+
+    # Comparación contra la referencia vectorizada
+    reference = results.get("NumPyLexsort")
+    if reference:
+        for name, elapsed in results.items():
+            print(f"{name}: {elapsed / reference:.1f}x el tiempo de NumPyLexsort")
 
     return results
 
@@ -77,3 +98,6 @@ if __name__ == "__main__":
     entries = get_entries(INPUT)
     results = benchmark(entries)
     plot_results(results)
+    # Sample sort en paralelo (parallel_sort.py): speedup según la cantidad de procesos
+    print("\n== Speedup en paralelo ==")
+    speedup_report(entries, algorithms=("QuickSort", "HeapSort"))
@@ -0,0 +1,143 @@
+import gc
+import multiprocessing
+import os
+import statistics
+import time
+from multiprocessing.connection import wait
+
+try:
+    import resource  # solo POSIX: límite de memoria del proceso
+except ImportError:
+    resource = None
+
+
+# ---------------- Ejecución aislada de algoritmos ----------------
+# Cada algoritmo corre en su propio proceso con un presupuesto de tiempo (reloj
+# de pared) y un tope de memoria. Si se pasa del tiempo el proceso se termina y
+# queda registrado como "timeout" para ese tamaño; si agota la memoria o revienta
+# (recursión en tree_sort, por ejemplo) se registra el error sin tumbar el resto.
+# Los algoritmos independientes se ejecutan a la vez, uno por núcleo.
+# Dentro del proceso se mide con time_algorithm, el mismo helper que usan las
+# mediciones sin aislar (benchmark_suite, benchmark.py): mismos tiempos comparables.
+
+DEFAULT_TIMEOUT = 60.0          # segundos por algoritmo (todas las repeticiones)
+DEFAULT_MEMORY_LIMIT_MB = 2048  # tope de memoria virtual de cada proceso
+WARMUP_SIZE = 500               # el calentamiento usa una porción pequeña de la entrada
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_MEMORY = "memory"
+STATUS_ERROR = "error"
+STATUS_CRASHED = "crashed"
+
+
+def _limit_memory(memory_limit_mb):
+    if resource is None or not memory_limit_mb:
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def time_algorithm(algo, data, repetitions=1, warmup=0):
+    """
+    Tiempos (segundos) de cada repetición; cada una recibe su propia copia de la
+    entrada. El recolector de basura se apaga durante cada medición.
+    """
+    for _ in range(warmup):
+        algo(list(data[:WARMUP_SIZE]))
+
+    times = []
+    for _ in range(repetitions):
+        sample = list(data)
+        gc.collect()
+        gc_enabled = gc.isenabled()
+        gc.disable()  # que el recolector no caiga en medio de una medición
+        try:
+            start = time.perf_counter()
+            algo(sample)
+            times.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return times
+
+
+def _worker(conn, algo, entries, repetitions, warmup, memory_limit_mb):
+    """Cuerpo del proceso hijo: mide el algoritmo y envía el resultado por el pipe."""
+    try:
+        _limit_memory(memory_limit_mb)
+        # Las claves precalculadas llegan dentro de las filas (KEY_FIELD)
+        conn.send({"status": STATUS_OK, "times": time_algorithm(algo, entries, repetitions, warmup)})
+    except MemoryError:
+        conn.send({"status": STATUS_MEMORY, "error": "MemoryError"})
+    except BaseException as e:  # RecursionError incluido
+        conn.send({"status": STATUS_ERROR, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_isolated(entries, algorithms, repetitions=1, warmup=0, timeout=DEFAULT_TIMEOUT,
+                 memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, workers=None):
+    """
+    Ejecuta cada algoritmo de `algorithms` ({nombre: función}) sobre la misma
+    entrada, cada uno en su proceso. Como mucho `workers` procesos a la vez
+    (por defecto, uno por núcleo).
+    Devuelve {nombre: {"status": ..., "times": [...]}}; "times" solo si status es "ok".
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = list(algorithms.items())
+    running = {}  # conexión -> (nombre, proceso, instante límite)
+    results = {}
+
+    while pending or running:
+        # Lanzar procesos hasta llenar los núcleos disponibles
+        while pending and len(running) < workers:
+            name, algo = pending.pop(0)
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(child_conn, algo, entries, repetitions, warmup, memory_limit_mb),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            running[parent_conn] = (name, process, time.monotonic() + timeout)
+
+        # Esperar al primero que termine o al próximo vencimiento
+        next_deadline = min(deadline for _, _, deadline in running.values())
+        ready = wait(list(running), timeout=max(0.0, next_deadline - time.monotonic()))
+
+        for conn in ready:
+            name, process, _ = running.pop(conn)
+            try:
+                results[name] = conn.recv()
+            except EOFError:
+                # El proceso murió sin responder (segfault, OOM killer...)
+                process.join()
+                results[name] = {"status": STATUS_CRASHED, "error": f"exitcode {process.exitcode}"}
+            conn.close()
+            process.join()
+
+        now = time.monotonic()
+        for conn, (name, process, deadline) in list(running.items()):
+            if now >= deadline:
+                process.terminate()
+                process.join()
+                conn.close()
+                del running[conn]
+                results[name] = {"status": STATUS_TIMEOUT, "error": f"más de {timeout} s"}
+
+    return {name: results[name] for name in algorithms}
+
+
+def describe(name, n, result):
+    """Línea de resumen para consola: 'GnomeSort: timed out at size 4750 ...'."""
+    status = result["status"]
+    if status == STATUS_OK:
+        return f"{name}: {statistics.median(result['times']):.6f} segundos (n={n})"
+    if status == STATUS_TIMEOUT:
+        return f"{name}: timed out at size {n} ({result['error']})"
+    return f"{name}: {status} at size {n} ({result['error']})"
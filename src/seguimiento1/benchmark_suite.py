@@ -0,0 +1,230 @@
+import csv
+import json
+import math
+import random
+import statistics
+import matplotlib.pyplot as plt
+from benchmark import ALGORITHMS, get_entries, plot_results
+from benchmark_runner import DEFAULT_MEMORY_LIMIT_MB, STATUS_OK, describe, run_isolated, time_algorithm
+from sort_keys import attach_keys, build_keys
+
+
+# ---------- Suite de benchmark ----------
+# Cada algoritmo se mide sobre tamaños geométricos (100, 200, 400, ... 50k),
+# con calentamiento y varias repeticiones; se reporta mediana e IQR y se ajusta
+# una curva de complejidad empírica (n, n log n, n²) para cada algoritmo.
+# Hasta el tamaño del corpus real se usan muestras de unificado.bib; por
+# encima se generan corpus sintéticos con la misma forma (year, title).
+
+DEFAULT_SIZES_START = 100
+DEFAULT_SIZES_STOP = 50_000
+DEFAULT_REPETITIONS = 5
+DEFAULT_WARMUP = 1
+MAX_SECONDS = 2.0          # si la mediana supera esto, el algoritmo no sigue creciendo
+TIMEOUT = 120.0            # presupuesto por algoritmo y tamaño en modo aislado
+
+COMPLEXITY_MODELS = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * math.log2(n),
+    "n^2": lambda n: n * n,
+}
+
+_SYNTHETIC_WORDS = (
+    "generative artificial intelligence education learning model language large "
+    "review systematic analysis students healthcare chatgpt ethics design data "
+    "framework evaluation impact university teaching {AI} \\'{e}tude diseño análisis"
+).split()
+
+
+def geometric_sizes(start=DEFAULT_SIZES_START, stop=DEFAULT_SIZES_STOP, factor=2):
+    """100, 200, 400, ... hasta stop (incluido)."""
+    sizes = []
+    n = start
+    while n < stop:
+        sizes.append(n)
+        n *= factor
+    sizes.append(stop)
+    return sizes
+
+
+def synthetic_entries(n, rng):
+    """Entradas sintéticas con año agrupado y títulos de 4 a 14 palabras (con tildes y LaTeX)."""
+    return [
+        {
+            "year": str(rng.choice((2019, 2020, 2021, 2022, 2023, 2023, 2024, 2024, 2024, 2025, 2025))),
+            "title": " ".join(rng.choice(_SYNTHETIC_WORDS) for _ in range(rng.randint(4, 14))).capitalize(),
+        }
+        for _ in range(n)
+    ]
+
+
+def make_input(entries, n, rng):
+    """Muestra de n entradas del corpus real, o sintéticas si n supera el corpus."""
+    if n <= len(entries):
+        return rng.sample(entries, n), "corpus"
+    synthetic = synthetic_entries(n, rng)
+    # Igual que las filas del corpus, las sintéticas llevan sus claves precalculadas
+    attach_keys(synthetic, build_keys(synthetic))
+    return synthetic, "synthetic"
+
+
+def summarize(times):
+    """Mediana, cuartiles e IQR de una lista de tiempos."""
+    median = statistics.median(times)
+    if len(times) >= 2:
+        q1, _, q3 = statistics.quantiles(times, n=4, method="inclusive")
+    else:
+        q1 = q3 = median
+    return {
+        "median": median,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "min": min(times),
+        "mean": statistics.fmean(times),
+        "repetitions": len(times),
+    }
+
+
+def fit_complexity(points):
+    """
+    Ajusta t = c·f(n) para cada modelo por mínimos cuadrados relativos
+    (cada tamaño pesa lo mismo) y devuelve el de menor error.
+    points: lista de (n, mediana).
+    """
+    points = [(n, t) for n, t in points if t > 0]
+    if len(points) < 2:
+        return None
+
+    fits = {}
+    for name, f in COMPLEXITY_MODELS.items():
+        # minimizar sum(((t - c·x) / t)²)  =>  c = sum(x/t) / sum((x/t)²)
+        ratios = [f(n) / t for n, t in points]
+        c = sum(ratios) / sum(r * r for r in ratios)
+        error = sum((1 - c * r) ** 2 for r in ratios) / len(ratios)
+        fits[name] = {"coefficient": c, "error": error}
+
+    best = min(fits, key=lambda name: fits[name]["error"])
+    return {"model": best, "coefficient": fits[best]["coefficient"], "models": fits}
+
+
+def predict(fit, n):
+    """Tiempo estimado para n entradas según la curva ajustada."""
+    return fit["coefficient"] * COMPLEXITY_MODELS[fit["model"]](n)
+
+
+def benchmark_suite(entries, sizes=None, algorithms=ALGORITHMS, repetitions=DEFAULT_REPETITIONS,
+                    warmup=DEFAULT_WARMUP, max_seconds=MAX_SECONDS, seed=42, isolated=False,
+                    timeout=TIMEOUT, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, workers=None):
+    """
+    Ejecuta la suite completa. Todos los algoritmos reciben exactamente la misma
+    entrada para cada tamaño. Devuelve un dict listo para exportar a JSON.
+    Con isolated=True cada algoritmo corre en su proceso (ver benchmark_runner):
+    los que superan `timeout` o fallan quedan registrados con su estado en ese
+    tamaño y no se miden con tamaños mayores.
+    """
+    sizes = sizes or geometric_sizes()
+    rng = random.Random(seed)
+    results = {name: [] for name in algorithms}
+    active = dict(algorithms)
+
+    for n in sizes:
+        data, source = make_input(entries, n, rng)
+        if isolated:
+            outcomes = run_isolated(data, active, repetitions, warmup, timeout, memory_limit_mb, workers)
+        else:
+            outcomes = {name: {"status": STATUS_OK, "times": time_algorithm(algo, data, repetitions, warmup)}
+                        for name, algo in active.items()}
+
+        for name, outcome in outcomes.items():
+            if outcome["status"] != STATUS_OK:
+                results[name].append({"n": n, "source": source, "status": outcome["status"]})
+                print(f"{describe(name, n, outcome)}: no se mide con tamaños mayores")
+                del active[name]
+                continue
+            stats = summarize(outcome["times"])
+            results[name].append({"n": n, "source": source, "status": STATUS_OK, **stats})
+            print(f"{name:>20} n={n:>6} ({source}): mediana {stats['median']:.6f} s  IQR {stats['iqr']:.6f} s")
+            if stats["median"] > max_seconds:
+                print(f"{name:>20} supera {max_seconds} s: no se mide con tamaños mayores")
+                del active[name]
+
+    fits = {name: fit_complexity([(p["n"], p["median"]) for p in measured(points)])
+            for name, points in results.items()}
+    return {"sizes": sizes, "repetitions": repetitions, "warmup": warmup, "seed": seed,
+            "results": results, "fits": fits}
+
+
+def measured(points):
+    """Solo los puntos que terminaron bien (sin timeouts ni errores)."""
+    return [p for p in points if p["status"] == STATUS_OK]
+
+
+def print_fits(suite, predict_n=100_000):
+    for name, fit in suite["fits"].items():
+        if fit is None:
+            print(f"{name}: datos insuficientes para ajustar")
+            continue
+        print(f"{name}: O({fit['model']})  c={fit['coefficient']:.3e}  "
+              f"estimado para n={predict_n}: {predict(fit, predict_n):.2f} s")
+
+
+def medians_at(suite, n):
+    """{algoritmo: mediana} para un tamaño dado (para la gráfica de barras)."""
+    return {
+        name: p["median"]
+        for name, points in suite["results"].items()
+        for p in measured(points)
+        if p["n"] == n
+    }
+
+
+# ---------- Exportación ----------
+def export_results(suite, basename):
+    """Escribe basename.json (todo) y basename.csv (una fila por algoritmo y tamaño)."""
+    with open(basename + ".json", "w", encoding="utf-8") as f:
+        json.dump(suite, f, indent=2)
+
+    columns = ["algorithm", "n", "source", "status", "median", "q1", "q3", "iqr", "min", "mean", "repetitions"]
+    with open(basename + ".csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for name, points in suite["results"].items():
+            for p in points:
+                writer.writerow({"algorithm": name, **{c: p.get(c, "") for c in columns[1:]}})
+    print(f"Resultados exportados en {basename}.json y {basename}.csv")
+
+
+def plot_scaling(suite, save_path):
+    """Mediana vs tamaño (escala log-log) con barras de error Q1–Q3."""
+    plt.figure(figsize=(12, 7))
+    for name, points in suite["results"].items():
+        points = measured(points)
+        if not points:
+            continue
+        ns = [p["n"] for p in points]
+        medians = [p["median"] for p in points]
+        errors = [[p["median"] - p["q1"] for p in points], [p["q3"] - p["median"] for p in points]]
+        plt.errorbar(ns, medians, yerr=errors, marker="o", capsize=3, label=name)
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.xlabel("Número de entradas (n)")
+    plt.ylabel("Tiempo mediano (segundos)")
+    plt.title("Escalamiento de los algoritmos de ordenamiento")
+    plt.legend(fontsize="small", ncol=2)
+    plt.tight_layout()
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Gráfica guardada en {save_path}")
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    entries = get_entries(INPUT)
+    suite = benchmark_suite(entries, isolated=True)
+    print_fits(suite)
+    export_results(suite, "./files/benchmark")
+    plot_scaling(suite, "./files/benchmark_scaling.png")
+    # Gráfica de barras (files/benchmark.png) con las medianas del mayor tamaño de corpus real
+    plot_results(medians_at(suite, max(n for n in suite["sizes"] if n <= len(entries))))
@@ -0,0 +1,231 @@
+import re
+
+
+# ---------------- Lectura incremental de archivos .bib ----------------
+# Lee el archivo por bloques y entrega cada entrada apenas se cierra su última llave,
+# sin cargar el archivo completo ni construir un BibDatabase. Funciona también con el
+# formato de IEEE, donde las entradas vienen pegadas: ...}}@INPROCEEDINGS{...
+# Las entradas salen con el mismo formato que bibtexparser.load (campos en minúscula,
+# llaves externas removidas, ENTRYTYPE e ID).
+
+CHUNK_SIZE = 1 << 16
+
+STANDARD_TYPES = {
+    "article", "book", "booklet", "conference", "inbook", "incollection",
+    "inproceedings", "manual", "mastersthesis", "misc", "phdthesis",
+    "proceedings", "techreport", "unpublished",
+}
+
+COMMON_STRINGS = {
+    "jan": "January", "feb": "February", "mar": "March", "apr": "April",
+    "may": "May", "jun": "June", "jul": "July", "aug": "August",
+    "sep": "September", "oct": "October", "nov": "November", "dec": "December",
+}
+
+_HEAD_RE = re.compile(r"@\s*([A-Za-z]+)\s*([{(])")
+_DELIM_RE = re.compile(r"[{}()]")
+_BRACES_RE = re.compile(r"[{}]")
+_QUOTED_RE = re.compile(r'[{}"]')
+_SPACE_RE = re.compile(r"\s*")
+_SEPARATOR_RE = re.compile(r"[\s,]*")
+_FIELD_NAME_RE = re.compile(r"[\w\-().+]+")
+_INTEGER_RE = re.compile(r"\d+")
+_STRING_NAME_RE = re.compile(r"[\w\-:]+")
+
+
+def _strip_after_new_lines(text):
+    """Quita espacios iniciales en todas las líneas menos la primera (como bibtexparser)."""
+    lines = text.splitlines()
+    if len(lines) > 1:
+        lines = [lines[0]] + [line.lstrip() for line in lines[1:]]
+    return "\n".join(lines)
+
+
+def _iter_records(bibtex_file, chunk_size):
+    """Genera (tipo, contenido) por cada bloque @tipo{...} leyendo el archivo por partes."""
+    buffer = bibtex_file.read(chunk_size)
+    if buffer.startswith("\ufeff"):  # BOM
+        buffer = buffer[1:]
+    eof = not buffer
+    pos = 0
+
+    while True:
+        head = _HEAD_RE.search(buffer, pos)
+        if head is None:
+            if eof:
+                return
+            # Texto fuera de entradas (comentarios implícitos): se descarta, pero se
+            # conserva desde el último @ por si es el inicio de una entrada cortada
+            at = buffer.rfind("@", pos)
+            buffer = buffer[at:] if at != -1 else ""
+            pos = 0
+            chunk = bibtex_file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        kind = head.group(1).lower()
+        closing = "}" if head.group(2) == "{" else ")"
+        body_start = head.end()
+
+        if kind == "comment":
+            # @comment se extiende hasta la siguiente línea que empieza con @
+            end = buffer.find("\n@", body_start)
+            while end == -1 and not eof:
+                chunk = bibtex_file.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                end = buffer.find("\n@", body_start)
+            pos = len(buffer) if end == -1 else end + 1
+            continue
+
+        # Buscar la llave (o paréntesis) que cierra la entrada, pidiendo más
+        # bloques mientras no aparezca; el escaneo continúa donde quedó
+        depth = 0
+        scan = body_start
+        end = -1
+        while end == -1:
+            for m in _DELIM_RE.finditer(buffer, scan):
+                char = m.group()
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    if depth == 0 and closing == "}":
+                        end = m.start()
+                        break
+                    depth -= 1
+                elif char == ")" and depth == 0 and closing == ")":
+                    end = m.start()
+                    break
+            if end == -1:
+                if eof:
+                    raise ValueError(f"Entrada @{kind} sin cerrar al final del archivo")
+                scan = len(buffer)
+                chunk = bibtex_file.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+
+        yield kind, buffer[body_start:end]
+        pos = end + 1
+
+        # Compactar el buffer para que la memoria no crezca con el archivo
+        if pos > chunk_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def _match_delimited(text, pos, pattern, closing):
+    """Devuelve la posición del delimitador que cierra en nivel 0 de llaves."""
+    depth = 0
+    for m in pattern.finditer(text, pos):
+        char = m.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            if depth == 0 and closing == "}":
+                return m.start()
+            depth -= 1
+        elif depth == 0:  # comilla de cierre
+            return m.start()
+    raise ValueError("Valor BibTeX sin cerrar")
+
+
+def _parse_value(body, pos, strings):
+    """Lee un valor ({..}, "..", número o macros unidas con #). Devuelve (valor, posición final)."""
+    integer = _INTEGER_RE.match(body, pos)
+    if integer:
+        return integer.group(), integer.end()
+
+    parts = []
+    while True:
+        char = body[pos:pos + 1]
+        if char == "{":
+            end = _match_delimited(body, pos + 1, _BRACES_RE, "}")
+            parts.append(body[pos + 1:end])
+            pos = end + 1
+        elif char == '"':
+            end = _match_delimited(body, pos + 1, _QUOTED_RE, '"')
+            parts.append(body[pos + 1:end])
+            pos = end + 1
+        else:
+            name = _STRING_NAME_RE.match(body, pos)
+            if name is None:
+                raise ValueError(f"Valor BibTeX inválido cerca de: {body[pos:pos + 30]!r}")
+            if name.group().lower() not in strings:
+                raise ValueError(f"Macro @string no definida: {name.group()}")
+            parts.append(strings[name.group().lower()])
+            pos = name.end()
+
+        pos = _SPACE_RE.match(body, pos).end()
+        if not body.startswith("#", pos):
+            return "".join(parts), pos
+        pos = _SPACE_RE.match(body, pos + 1).end()
+
+
+def _parse_fields(body, pos, strings):
+    """Lee la lista campo = valor, ... y la devuelve como lista de pares."""
+    fields = []
+    while True:
+        pos = _SEPARATOR_RE.match(body, pos).end()
+        if pos >= len(body):
+            return fields
+        name = _FIELD_NAME_RE.match(body, pos)
+        if name is None:
+            raise ValueError(f"Campo BibTeX inválido cerca de: {body[pos:pos + 30]!r}")
+        pos = _SPACE_RE.match(body, name.end()).end()
+        if not body.startswith("=", pos):
+            raise ValueError(f"Falta '=' después del campo {name.group()}")
+        pos = _SPACE_RE.match(body, pos + 1).end()
+        value, pos = _parse_value(body, pos, strings)
+        fields.append((name.group(), _strip_after_new_lines(value)))
+
+
+def _clean_val(value):
+    if not value or value == "{}":
+        return ""
+    return value
+
+
+def _parse_entry(kind, body, strings):
+    comma = body.find(",")
+    if comma == -1:
+        raise ValueError(f"Entrada @{kind} sin clave")
+    entry_id = body[:comma].strip()
+    if not entry_id or any(c.isspace() for c in entry_id):
+        raise ValueError(f"Clave inválida en entrada @{kind}: {entry_id!r}")
+
+    # Igual que bibtexparser: si un campo se repite gana la primera aparición
+    fields = {name: value for name, value in reversed(_parse_fields(body, comma + 1, strings))}
+    entry = {name.lower(): _clean_val(value) for name, value in fields.items()}
+    entry["ENTRYTYPE"] = kind
+    entry["ID"] = entry_id
+    return entry
+
+
+def iter_bib_entries(input_file, chunk_size=CHUNK_SIZE, common_strings=True):
+    """
+    Genera las entradas de un archivo .bib una por una.
+    La memoria usada depende del tamaño de una entrada, no del archivo.
+    """
+    strings = dict(COMMON_STRINGS) if common_strings else {}
+    with open(input_file, encoding="utf-8") as bibtex_file:
+        for kind, body in _iter_records(bibtex_file, chunk_size):
+            if kind == "string":
+                name, _, value = body.partition("=")
+                value, _ = _parse_value(value.strip(), 0, strings)
+                strings[name.strip().lower()] = _clean_val(_strip_after_new_lines(value))
+            elif kind == "preamble":
+                continue
+            elif kind in STANDARD_TYPES:
+                yield _parse_entry(kind, body, strings)
+
+
+def iter_bib_files(input_files, chunk_size=CHUNK_SIZE):
+    """Encadena las entradas de varios archivos .bib en el orden dado."""
+    for input_file in input_files:
+        yield from iter_bib_entries(input_file, chunk_size)
+
+
+def load_entries(input_file):
+    """Lista completa de entradas (para los algoritmos que necesitan todo en memoria)."""
+    return list(iter_bib_entries(input_file))
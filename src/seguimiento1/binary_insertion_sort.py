@@ -1,53 +1,16 @@
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"[{}]", "", text)              # quitar llaves
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)    # quitar comandos LaTeX
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-
-# ---------------- Comparador ----------------
-def compare(entry1, entry2):
-    year1, year2 = int(entry1.get("year", 0)), int(entry2.get("year", 0))
-    if year1 < year2:
-        return -1
-    elif year1 > year2:
-        return 1
-    else:
-        title1 = normalize(entry1.get("title", ""))
-        title2 = normalize(entry2.get("title", ""))
-        if title1 < title2:
-            return -1
-        elif title1 > title2:
-            return 1
-        else:
-            return 0
+from corpus_cache import load_corpus
+from sort_keys import build_keys, index_list, apply_order
 
 
 # ---------------- Búsqueda binaria ----------------
-def binary_search(arr, item, start, end):
-    """Devuelve la posición correcta para insertar item en arr[start:end]."""
+def binary_search(arr, key, keys, start, end):
+    """Devuelve la posición correcta para insertar key en arr[start:end]."""
     while start < end:
         mid = (start + end) // 2
-        if compare(item, arr[mid]) < 0:
+        if key < keys[arr[mid]]:
             end = mid
         else:
             start = mid + 1
@@ -55,30 +18,31 @@ def binary_search(arr, item, start, end):
 
 
 # ---------------- Binary Insertion Sort ----------------
-def binary_insertion_sort(arr):
+def binary_insertion_sort(entries):
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    arr = index_list(len(entries))
     for i in range(1, len(arr)):
-        key = arr[i]
-        pos = binary_search(arr, key, 0, i)
+        item = arr[i]
+        pos = binary_search(arr, keys[item], keys, 0, i)
         # Desplazar elementos a la derecha
-        arr = arr[:pos] + [key] + arr[pos:i] + arr[i+1:]
-    return arr
+        arr = arr[:pos] + [item] + arr[pos:i] + arr[i+1:]
+    return apply_order(entries, arr)
 
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = binary_insertion_sort(bib_database.entries)
+    sorted_rows = binary_insertion_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -88,7 +52,7 @@ def sort_bib_file(input_file, output_file):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (Binary Insertion Sort): {elapsed:.6f} segundos")
-    print(f"📚 Total de entradas ordenadas: {len(sorted_entries)}")
+    print(f"📚 Total de entradas ordenadas: {len(sorted_rows)}")
 
 
 # ---------------- Ejecución directa ----------------
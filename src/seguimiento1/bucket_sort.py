@@ -1,43 +1,26 @@
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"[{}]", "", text)              # quitar llaves
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)    # quitar comandos LaTeX
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
+from corpus_cache import load_corpus
+from sort_keys import build_key_columns, index_list, apply_order
 
 # ---------------- Insertion Sort (para ordenar dentro de cada bucket) ----------------
-def insertion_sort(bucket):
+def insertion_sort(bucket, years, titles):
+    """Ordena in-place una lista de índices usando las columnas de claves precalculadas."""
     for i in range(1, len(bucket)):
         key = bucket[i]
         j = i - 1
 
         while j >= 0:
-            year_j = int(bucket[j].get("year", 0))
-            year_key = int(key.get("year", 0))
+            year_j = years[bucket[j]]
+            year_key = years[key]
 
             # comparar por año
             if year_j > year_key:
                 bucket[j + 1] = bucket[j]
             elif year_j == year_key:
                 # si año es igual, comparar por título
-                if normalize(bucket[j].get("title", "")) > normalize(key.get("title", "")):
+                if titles[bucket[j]] > titles[key]:
                     bucket[j + 1] = bucket[j]
                 else:
                     break
@@ -52,43 +35,41 @@ def bucket_sort(entries, bucket_size=5):
     if not entries:
         return []
 
-    years = [int(e.get("year", 0)) for e in entries]
+    years, titles = build_key_columns(entries)  # claves calculadas una sola vez
     min_year, max_year = min(years), max(years)
     bucket_count = (max_year - min_year) // bucket_size + 1
 
     # Crear buckets
-    buckets = [[] for _ in range(bucket_count)]
+    buckets = [index_list() for _ in range(bucket_count)]
 
-    # Distribuir entradas en buckets según rango de año
-    for entry in entries:
-        year = int(entry.get("year", 0))
+    # Distribuir índices de entradas en buckets según rango de año
+    for i, year in enumerate(years):
         index = (year - min_year) // bucket_size
-        buckets[index].append(entry)
+        buckets[index].append(i)
 
     # Ordenar cada bucket con insertion sort
-    sorted_entries = []
+    order = index_list()
     for bucket in buckets:
         if bucket:
-            insertion_sort(bucket)  # ordenar in-place
-            sorted_entries.extend(bucket)
+            insertion_sort(bucket, years, titles)  # ordenar in-place
+            order.extend(bucket)
 
-    return sorted_entries
+    return apply_order(entries, order)
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file, bucket_size=5):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = bucket_sort(bib_database.entries, bucket_size)
+    sorted_rows = bucket_sort(rows, bucket_size)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -98,7 +79,7 @@ def sort_bib_file(input_file, output_file, bucket_size=5):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (Bucket Sort): {elapsed:.6f} segundos")
-    print(f"📚 Total de entradas ordenadas: {len(sorted_entries)}")
+    print(f"📚 Total de entradas ordenadas: {len(sorted_rows)}")
 
 # ---------------- Ejecución directa ----------------
 if __name__ == "__main__":
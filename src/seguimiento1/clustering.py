@@ -0,0 +1,283 @@
+import csv
+import os
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from bib_stream import iter_bib_entries
+from term_frequency import build_term_matrices
+
+
+# ---------------- Agrupamiento temático de abstracts ----------------
+# 1. la matriz documento-término de abstracts (term_frequency.py, CSR) se pasa a
+#    TF-IDF: se descartan términos en menos de MIN_DF documentos o en más de
+#    MAX_DF_RATIO de ellos, y cada fila se normaliza (norma L2 = 1), así el
+#    producto punto entre filas es la similitud coseno
+# 2. k-means esférico (inicialización k-means++): las similitudes documento ×
+#    centroide se calculan por bloques de filas de la matriz dispersa; nunca se
+#    arma la matriz n × n ni la matriz densa documento × término
+# 3. los k grupos se unen jerárquicamente con enlace promedio. Como las filas
+#    están normalizadas, la similitud promedio entre todos los pares de documentos
+#    de dos grupos es (suma_A · suma_B) / (n_A · n_B): el dendrograma es exacto
+#    sin comparar documentos uno a uno.
+# Resultado en files/ (junto a top_authores.png): etiquetas en CSV y dendrograma.
+
+N_CLUSTERS = 12
+MIN_DF = 2
+MAX_DF_RATIO = 0.5
+MAX_ITERATIONS = 50
+BLOCK_ROWS = 2048  # filas de la matriz dispersa por bloque
+
+
+class TfidfMatrix:
+    """Filas TF-IDF normalizadas en CSR (solo los documentos con algún término)."""
+
+    def __init__(self, indptr, indices, data, vocabulary, rows):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.vocabulary = vocabulary
+        self.rows = rows  # fila del documento en el corpus
+
+    @property
+    def shape(self):
+        return len(self.indptr) - 1, len(self.vocabulary)
+
+    def row_ids(self, start=0, stop=None):
+        """Fila local de cada valor no nulo de las filas start..stop."""
+        stop = self.shape[0] if stop is None else stop
+        return np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+
+    def dot(self, dense, block=BLOCK_ROWS):
+        """
+        Producto filas × dense.T (dense: m × términos) -> n × m, por bloques de filas:
+        en memoria solo quedan los valores no nulos del bloque por m.
+        """
+        n = self.shape[0]
+        out = np.zeros((n, len(dense)))
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            lo, hi = self.indptr[start], self.indptr[stop]
+            values = self.data[lo:hi, None] * dense[:, self.indices[lo:hi]].T
+            # todas las filas tienen algún término (tfidf descarta las vacías): reduceat es seguro
+            out[start:stop] = np.add.reduceat(values, self.indptr[start:stop] - lo, axis=0)
+        return out
+
+    def sum_rows(self, labels, k):
+        """Suma de los vectores de cada grupo (k × términos), sin densificar la matriz."""
+        sums = np.zeros((k, self.shape[1]))
+        cells = labels[self.row_ids()] * self.shape[1] + self.indices
+        sums.ravel()[:] = np.bincount(cells, weights=self.data, minlength=k * self.shape[1])
+        return sums
+
+
+def tfidf(matrix, min_df=MIN_DF, max_df_ratio=MAX_DF_RATIO):
+    """TfidfMatrix a partir de una TermMatrix de conteos (term_frequency.TermMatrix)."""
+    n_docs = matrix.shape[0]
+    df = matrix.document_frequency()
+    keep = (df >= min_df) & (df <= max_df_ratio * n_docs)
+    new_id = np.cumsum(keep) - 1
+
+    rows = np.repeat(np.arange(n_docs), np.diff(matrix.indptr))
+    mask = keep[matrix.indices]
+    rows, cols = rows[mask], new_id[matrix.indices[mask]]
+    idf = np.log((1 + n_docs) / (1 + df[keep])) + 1
+    data = matrix.data[mask] * idf[cols]
+
+    # norma L2 por fila; los documentos que quedan sin términos se descartan
+    norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n_docs))
+    present = np.flatnonzero(norms > 0)
+    data = data / norms[rows]
+    local = np.full(n_docs, -1)
+    local[present] = np.arange(len(present))
+    indptr = np.zeros(len(present) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(local[rows], minlength=len(present)), out=indptr[1:])
+    vocabulary = [term for term, kept in zip(matrix.vocabulary, keep) if kept]
+    return TfidfMatrix(indptr, cols, data, vocabulary, present)
+
+
+# ---------------- k-means esférico ----------------
+def _normalize_rows(dense):
+    norms = np.linalg.norm(dense, axis=1, keepdims=True)
+    return dense / np.where(norms > 0, norms, 1)
+
+
+def _row_vector(X, i):
+    vector = np.zeros(X.shape[1])
+    lo, hi = X.indptr[i], X.indptr[i + 1]
+    vector[X.indices[lo:hi]] = X.data[lo:hi]
+    return vector
+
+
+def init_centroids(X, k, rng):
+    """k-means++ con distancia coseno: cada centro nuevo se elige con probabilidad ∝ d²."""
+    n = X.shape[0]
+    centroids = [_row_vector(X, rng.integers(n))]
+    best = X.dot(np.array(centroids))[:, 0]
+    for _ in range(1, k):
+        weights = np.clip(1 - best, 0, None) ** 2
+        total = weights.sum()
+        i = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+        centroids.append(_row_vector(X, i))
+        best = np.maximum(best, X.dot(centroids[-1][None, :])[:, 0])
+    return np.array(centroids)
+
+
+def kmeans(X, k=N_CLUSTERS, max_iterations=MAX_ITERATIONS, seed=42):
+    """
+    Etiqueta de grupo de cada fila y centroides (normalizados). Los grupos salen
+    ordenados por tamaño y ninguno queda vacío (los vacíos se descartan al final),
+    así que puede haber menos de k. Sin documentos devuelve ([], matriz 0 × términos).
+    """
+    n = X.shape[0]
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, X.shape[1]))
+    rng = np.random.default_rng(seed)
+    k = max(1, min(k, n))
+    centroids = init_centroids(X, k, rng)
+    labels = None
+    for _ in range(max_iterations):
+        new_labels = X.dot(centroids).argmax(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        sums = X.sum_rows(labels, k)
+        empty = np.flatnonzero(np.bincount(labels, minlength=k) == 0)
+        sums[empty] = centroids[empty]  # un grupo vacío conserva su centro
+        centroids = _normalize_rows(sums)
+
+    # grupo 0 = el más grande; los grupos que quedaron vacíos se descartan
+    sizes = np.bincount(labels, minlength=k)
+    order = np.argsort(-sizes, kind="stable")
+    order = order[sizes[order] > 0]
+    relabel = np.full(k, -1, dtype=np.int64)
+    relabel[order] = np.arange(len(order))
+    return relabel[labels], centroids[order]
+
+
+# ---------------- Enlace jerárquico entre grupos ----------------
+def average_linkage(sums, sizes):
+    """
+    Enlace promedio (UPGMA) entre grupos a partir de la suma de sus vectores.
+    Devuelve una fila por unión: [grupo a, grupo b, distancia (1 - similitud), tamaño];
+    los grupos nuevos se numeran desde len(sums), como en scipy. Todos los grupos
+    deben tener al menos un documento (kmeans ya descarta los vacíos).
+    """
+    sums = [s for s in sums]
+    sizes = [int(s) for s in sizes]
+    if any(size <= 0 for size in sizes):
+        raise ValueError("average_linkage: hay grupos vacíos")
+    active = set(range(len(sums)))
+    linkage = []
+    while len(active) > 1:
+        best = None
+        for a in active:
+            for b in active:
+                if a < b:
+                    similarity = sums[a] @ sums[b] / (sizes[a] * sizes[b])
+                    if best is None or similarity > best[0]:
+                        best = (similarity, a, b)
+        similarity, a, b = best
+        sums.append(sums[a] + sums[b])
+        sizes.append(sizes[a] + sizes[b])
+        active -= {a, b}
+        active.add(len(sums) - 1)
+        linkage.append([a, b, max(0.0, 1 - similarity), sizes[-1]])
+    return np.array(linkage)
+
+
+def plot_dendrogram(linkage, labels, save_path, title):
+    """Dendrograma a partir de la matriz de enlace (hojas = grupos)."""
+    n = len(labels)
+    if n == 0:
+        print("No hay grupos: no se genera el dendrograma")
+        return
+    # orden de las hojas: recorrido con pila desde la raíz
+    children = {n + i: (int(row[0]), int(row[1])) for i, row in enumerate(linkage)}
+    leaves = []
+    stack = [n + len(linkage) - 1] if len(linkage) else [0]
+    while stack:
+        node = stack.pop()
+        if node < n:
+            leaves.append(node)
+        else:
+            left, right = children[node]
+            stack.extend((right, left))
+    x = {leaf: i for i, leaf in enumerate(leaves)}
+    # Entre textos las distancias promedio quedan todas cerca de 1: el eje arranca
+    # un poco por debajo de la primera unión para que se distingan los niveles
+    distances = linkage[:, 2] if len(linkage) else np.zeros(1)
+    floor = max(0.0, distances.min() - (distances.max() - distances.min()))
+    height = {leaf: floor for leaf in range(n)}
+
+    plt.figure(figsize=(12, 6))
+    for i, (a, b, distance, _) in enumerate(linkage):
+        a, b = int(a), int(b)
+        plt.plot([x[a], x[a], x[b], x[b]], [height[a], distance, distance, height[b]], color="steelblue")
+        x[n + i] = (x[a] + x[b]) / 2
+        height[n + i] = distance
+    plt.xticks(range(n), [labels[leaf] for leaf in leaves], rotation=45, ha="right", fontsize="small")
+    plt.ylim(floor, distances.max() + 0.02 * (distances.max() - floor or 1))
+    plt.ylabel("Distancia coseno promedio")
+    plt.title(title)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Gráfica guardada en {save_path}")
+
+
+# ---------------- Pipeline ----------------
+def top_cluster_terms(X, centroids, n_terms=5):
+    """Términos con más peso en cada centroide."""
+    top = np.argsort(-centroids, axis=1)[:, :n_terms]
+    return [[X.vocabulary[j] for j in row] for row in top]
+
+
+def cluster_abstracts(input_file, k=N_CLUSTERS, seed=42):
+    """
+    Agrupa los abstracts del .bib (lectura en streaming). Devuelve un dict con las
+    filas del corpus con abstract, su grupo, los IDs/títulos/años, los términos de
+    cada grupo y la matriz de enlace entre grupos.
+    """
+    ids, titles = [], []
+
+    def recorded(entries):
+        for entry in entries:
+            ids.append(entry.get("ID", ""))
+            titles.append(entry.get("title", ""))
+            yield entry
+
+    counts = build_term_matrices(recorded(iter_bib_entries(input_file)), fields=("abstract",))["abstract"]
+    X = tfidf(counts)
+    labels, centroids = kmeans(X, k, seed=seed)
+    k = len(centroids)
+    sums = X.sum_rows(labels, k)
+    sizes = np.bincount(labels, minlength=k)
+    return {
+        "rows": X.rows, "labels": labels, "ids": ids, "titles": titles, "years": counts.years,
+        "sizes": sizes, "terms": top_cluster_terms(X, centroids), "linkage": average_linkage(sums, sizes),
+    }
+
+
+def export_labels(result, save_path):
+    with open(save_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "year", "cluster", "cluster_terms", "title"])
+        for row, label in zip(result["rows"].tolist(), result["labels"].tolist()):
+            writer.writerow([result["ids"][row], result["years"][row], label,
+                             " ".join(result["terms"][label]), result["titles"][row]])
+    print(f"Etiquetas guardadas en {save_path}")
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    start = time.perf_counter()
+    result = cluster_abstracts(INPUT)
+    print(f"⏱️ {len(result['rows'])} abstracts agrupados en {time.perf_counter() - start:.3f} segundos")
+    for cluster, (size, terms) in enumerate(zip(result["sizes"], result["terms"])):
+        print(f"Grupo {cluster} ({size} abstracts): {', '.join(terms)}")
+    export_labels(result, "./files/clusters_abstracts.csv")
+    leaf_labels = [f"{c}: {' '.join(t[:3])}" for c, t in enumerate(result["terms"])]
+    plot_dendrogram(result["linkage"], leaf_labels, "./files/dendrograma_abstracts.png",
+                    "Dendrograma de grupos temáticos (enlace promedio)")
@@ -0,0 +1,185 @@
+import heapq
+import time
+from array import array
+from itertools import combinations
+import numpy as np
+from corpus_cache import load_corpus
+from author_index import normalize_author
+
+
+# ---------------- Grafo de coautoría ----------------
+# Un nodo por autor normalizado (mismo criterio que top_authors) y una arista
+# entre cada par de autores que firmaron juntos, con peso = número de artículos
+# en común. Se arma en una sola pasada sobre la columna de autores del corpus:
+#   1. cada par (u < v) de una entrada se codifica como el entero u·n + v
+#   2. np.unique cuenta cuántas veces aparece cada código (el peso)
+#   3. las aristas, en ambos sentidos, se ordenan por origen y quedan en CSR:
+#      los vecinos de u son indices[indptr[u]:indptr[u + 1]] (ordenados) y sus
+#      pesos weights[indptr[u]:indptr[u + 1]]
+# Las consultas (grado, peso de un par, componentes, top de pares) trabajan
+# sobre esos arrays, sin dicts por nodo.
+
+class CoauthorGraph:
+    def __init__(self, names, papers, indptr, indices, weights):
+        self.names = names                        # id -> autor normalizado
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.papers = papers                      # artículos de cada autor
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._labels = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.indices) // 2
+
+    def _id(self, author):
+        return self.ids[normalize_author(author)]
+
+    # ---------- Grado y colaboraciones ----------
+    def degrees(self):
+        """Coautores distintos de cada autor."""
+        return np.diff(self.indptr)
+
+    def strengths(self):
+        """Colaboraciones ponderadas de cada autor (suma de pesos de sus aristas)."""
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), self.degrees())
+        return np.bincount(rows, weights=self.weights, minlength=len(self)).astype(np.int64)
+
+    def degree(self, author):
+        u = self._id(author)
+        return int(self.indptr[u + 1] - self.indptr[u])
+
+    def neighbors(self, author):
+        """[(coautor, artículos en común)] de mayor a menor número de artículos."""
+        u = self._id(author)
+        start, stop = self.indptr[u], self.indptr[u + 1]
+        pairs = zip(self.indices[start:stop].tolist(), self.weights[start:stop].tolist())
+        return [(self.names[v], w) for v, w in sorted(pairs, key=lambda x: (-x[1], self.names[x[0]]))]
+
+    def collaborations(self, author1, author2):
+        """Artículos firmados por ambos autores (0 si nunca colaboraron)."""
+        u, v = self._id(author1), self._id(author2)
+        start, stop = self.indptr[u], self.indptr[u + 1]
+        pos = start + np.searchsorted(self.indices[start:stop], v)  # vecinos ordenados: búsqueda binaria
+        if pos < stop and self.indices[pos] == v:
+            return int(self.weights[pos])
+        return 0
+
+    # ---------- Componentes conexas ----------
+    def components(self):
+        """Etiqueta de componente de cada autor (union-find sobre las aristas u < v)."""
+        if self._labels is not None:
+            return self._labels
+        parent = list(range(len(self)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]  # compresión por mitades
+                x = parent[x]
+            return x
+
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), self.degrees())
+        upper = rows < self.indices
+        for u, v in zip(rows[upper].tolist(), self.indices[upper].tolist()):
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                parent[max(ru, rv)] = min(ru, rv)
+
+        self._labels = np.fromiter((find(x) for x in range(len(self))), dtype=np.int64, count=len(self))
+        return self._labels
+
+    def component_sizes(self):
+        """Tamaños de las componentes, de mayor a menor."""
+        counts = np.bincount(self.components())
+        return np.sort(counts[counts > 0])[::-1]  # las etiquetas son la raíz de cada componente
+
+    def component_of(self, author):
+        """Autores de la misma componente que author."""
+        labels = self.components()
+        return [self.names[i] for i in np.flatnonzero(labels == labels[self._id(author)])]
+
+    # ---------- Rankings ----------
+    def top_pairs(self, k=10):
+        """Los k pares con más artículos en común: [(autor1, autor2, artículos)]."""
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), self.degrees())
+        upper = rows < self.indices
+        u, v, w = rows[upper], self.indices[upper], self.weights[upper]
+        if len(w) > k:
+            # Solo se ordenan los candidatos con peso >= al k-ésimo (empates incluidos)
+            threshold = np.partition(w, len(w) - k)[len(w) - k]
+            keep = w >= threshold
+            u, v, w = u[keep], v[keep], w[keep]
+        pairs = [(*sorted((self.names[a], self.names[b])), c) for a, b, c in zip(u.tolist(), v.tolist(), w.tolist())]
+        return heapq.nsmallest(k, pairs, key=lambda x: (-x[2], x[0], x[1]))
+
+    def top_by(self, values, k=10):
+        """Los k autores con mayor valor en un array por autor (grado, colaboraciones...)."""
+        return heapq.nsmallest(k, zip(self.names, values.tolist()), key=lambda x: (-x[1], x[0]))
+
+
+def build_coauthor_graph(corpus):
+    """Grafo de coautoría del corpus en una pasada por su columna de autores."""
+    # Ids de autor: cada nombre distinto del corpus se normaliza una vez
+    ids = {}
+    normalized = {}
+    names = []
+    for name in corpus.authors:
+        if name not in normalized:
+            author = normalize_author(name)
+            normalized[name] = author
+            if author and author not in ids:
+                ids[author] = len(names)
+                names.append(author)
+    n = len(names)
+
+    papers = np.zeros(n, dtype=np.int64)
+    codes = array("q")
+    for i in range(len(corpus)):
+        # Autores distintos de la entrada (un autor repetido no colabora consigo mismo)
+        authors = sorted({ids[normalized[name]] for name in corpus.entry_authors(i) if normalized[name]})
+        papers[authors] += 1
+        codes.extend(u * n + v for u, v in combinations(authors, 2))
+
+    codes, weights = np.unique(np.frombuffer(codes, dtype=np.int64), return_counts=True)
+    src, dst = np.divmod(codes, n) if n else (codes, codes)
+
+    # Ambos sentidos, ordenados por (origen, destino)
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    weights = np.concatenate([weights, weights])
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return CoauthorGraph(names, papers, indptr, cols[order], weights[order])
+
+
+def coauthor_graph(input_file):
+    return build_coauthor_graph(load_corpus(input_file))
+
+
+def print_summary(graph, top_n=10):
+    sizes = graph.component_sizes()
+    print(f"👥 {len(graph)} autores, {graph.edge_count} pares de coautores")
+    print(f"🔗 {len(sizes)} componentes conexas; la mayor tiene {sizes[0] if len(sizes) else 0} autores")
+    print(f"\n📊 Los {top_n} autores con más coautores distintos:")
+    for author, degree in graph.top_by(graph.degrees(), top_n):
+        print(f"{author}: {degree}")
+    print(f"\n📊 Los {top_n} autores con más colaboraciones (ponderadas):")
+    for author, strength in graph.top_by(graph.strengths(), top_n):
+        print(f"{author}: {strength}")
+    print(f"\n📊 Los {top_n} pares que más publicaron juntos:")
+    for author1, author2, count in graph.top_pairs(top_n):
+        print(f"{author1} — {author2}: {count}")
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    start = time.perf_counter()
+    graph = coauthor_graph(INPUT)
+    print(f"⏱️ Grafo construido en {time.perf_counter() - start:.3f} segundos")
+    print_summary(graph)
@@ -1,46 +1,14 @@
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    # eliminar llaves y comandos LaTeX
-    text = re.sub(r"[{}]", "", text)
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-# ---------------- Comparación entre entradas ----------------
-def compare(entry1, entry2) -> bool:
-    """
-    Retorna True si entry1 debe ir antes que entry2.
-    """
-    year1 = int(entry1.get("year", 0))
-    year2 = int(entry2.get("year", 0))
-
-    if year1 != year2:
-        return year1 < year2
-
-    title1 = normalize(entry1.get("title", ""))
-    title2 = normalize(entry2.get("title", ""))
-    return title1 <= title2
+from corpus_cache import load_corpus
+from sort_keys import build_keys, index_list, apply_order
 
 # ---------------- Algoritmo Comb Sort ----------------
 def comb_sort(entries):
-    n = len(entries)
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    order = index_list(len(entries))
+    n = len(order)
     gap = n
     shrink = 1.3
     sorted_flag = False
@@ -54,28 +22,27 @@ def comb_sort(entries):
 
         i = 0
         while i + gap < n:
-            if not compare(entries[i], entries[i + gap]):
-                entries[i], entries[i + gap] = entries[i + gap], entries[i]
+            if not keys[order[i]] <= keys[order[i + gap]]:
+                order[i], order[i + gap] = order[i + gap], order[i]
                 sorted_flag = False
             i += 1
 
-    return entries
+    return apply_order(entries, order)
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = comb_sort(bib_database.entries)
+    sorted_rows = comb_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -85,7 +52,7 @@ def sort_bib_file(input_file, output_file):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (Comb Sort): {elapsed:.6f} segundos")
-    print(f"📚 Entradas ordenadas: {len(sorted_entries)}")
+    print(f"📚 Entradas ordenadas: {len(sorted_rows)}")
 
 # ---------------- Ejecución directa ----------------
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+import marshal
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from bib_stream import iter_bib_entries
+from sort_keys import KEY_FIELD, normalize
+
+
+# ---------------- Corpus en columnas ----------------
+# En lugar de una lista de dicts (cada uno con una docena de campos que no se usan
+# para ordenar), el corpus guarda solo las columnas que usan los algoritmos:
+#   years            array('H') con el año de cada entrada
+#   titles           título normalizado (interned), parte de la clave de orden
+#   raw_titles       título original (interned), el title de las filas de key_rows
+#   ids              ID BibTeX de cada entrada
+#   authors          nombres de autor (interned) de todas las entradas, seguidos
+#   author_offsets   los autores de la fila i son authors[offsets[i]:offsets[i + 1]]
+# La entrada completa se guarda comprimida y se reconstruye solo al escribir el .bib.
+# Los algoritmos reciben KeyRow (ver key_rows): la clave y el número de fila, nada más.
+
+
+class KeyRow(Mapping):
+    """
+    Fila liviana para los algoritmos de ordenamiento: guarda solo la clave
+    precalculada (KEY_FIELD) y el número de fila (_row). Se lee como un dict de
+    solo lectura con title y year, que se buscan en las columnas del corpus
+    cuando alguien los pide (los algoritmos leen la clave con sort_key).
+    """
+    __slots__ = ("key", "row", "corpus")
+
+    def __init__(self, key, row, corpus):
+        self.key = key
+        self.row = row
+        self.corpus = corpus
+
+    def _fields(self):
+        # year solo si la entrada tiene año, igual que en el .bib
+        return (KEY_FIELD, "_row", "title", "year") if self.key[0] else (KEY_FIELD, "_row", "title")
+
+    def __getitem__(self, field):
+        if field == KEY_FIELD:
+            return self.key
+        if field == "_row":
+            return self.row
+        if field == "title":
+            return self.corpus.raw_titles[self.row]
+        if field == "year" and self.key[0]:
+            return str(self.key[0])
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        if field == KEY_FIELD:  # el caso de sort_key, sin pasar por __getitem__
+            return self.key
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self):
+        return len(self._fields())
+
+    def __repr__(self):
+        return f"KeyRow({dict(self)!r})"
+
+
+class Corpus:
+    def __init__(self):
+        self.ids = []
+        self.years = array("H")
+        self.titles = []
+        self.raw_titles = []
+        self.authors = []
+        self.author_offsets = array("I", [0])
+        self._records = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, entry):
+        title = entry.get("title", "")
+        self.ids.append(sys.intern(entry.get("ID", "")))
+        self.years.append(int(entry.get("year", 0)))
+        self.titles.append(sys.intern(normalize(title)))
+        self.raw_titles.append(sys.intern(title))
+        if "author" in entry:
+            # mismo criterio que top_authors: separar por " and "
+            self.authors.extend(sys.intern(a) for a in entry["author"].split(" and "))
+        self.author_offsets.append(len(self.authors))
+        self._records.append(zlib.compress(marshal.dumps(entry), 1))
+
+    @classmethod
+    def from_entries(cls, entries):
+        corpus = cls()
+        for entry in entries:
+            corpus.append(entry)
+        return corpus
+
+    @classmethod
+    def from_bib(cls, input_file):
+        """Construye el corpus leyendo el .bib en streaming (sin lista de dicts intermedia)."""
+        return cls.from_entries(iter_bib_entries(input_file))
+
+    # ---------- Serialización (caché) ----------
+    COLUMNS = ("ids", "years", "titles", "raw_titles", "authors", "author_offsets", "_records")
+
+    def columns(self):
+        """Columnas como datos simples (arrays, listas, bytes) para guardarlas en la caché."""
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    @classmethod
+    def from_columns(cls, columns):
+        corpus = cls()
+        for name in cls.COLUMNS:
+            setattr(corpus, name, columns[name])
+        return corpus
+
+    # ---------- Claves y autores ----------
+    def key(self, i):
+        return self.years[i], self.titles[i]
+
+    def keys(self):
+        return list(zip(self.years, self.titles))
+
+    def entry_authors(self, i):
+        return self.authors[self.author_offsets[i]:self.author_offsets[i + 1]]
+
+    # ---------- Filas para los algoritmos de ordenamiento ----------
+    def key_rows(self):
+        """
+        Una KeyRow por entrada: la clave ya calculada (KEY_FIELD), así build_keys
+        no vuelve a normalizar, y el número de fila para materializar después.
+        Con las 4,750 entradas del corpus unificado ocupan ~0.7 MB, contra ~1.7 MB
+        de filas dict con los mismos campos y ~19 MB de las entradas completas.
+        """
+        years = {}  # un solo objeto int por año distinto, compartido por todas las claves
+        return [KeyRow((years.setdefault(year, year), title), i, self)
+                for i, (year, title) in enumerate(zip(self.years, self.titles))]
+
+    # ---------- Materialización ----------
+    def entry(self, i):
+        return marshal.loads(zlib.decompress(self._records[i]))
+
+    def materialize(self, order=None):
+        """Entradas completas (dicts) en el orden dado; por defecto el original."""
+        if order is None:
+            order = range(len(self))
+        return [self.entry(i) for i in order]
+
+    def materialize_rows(self, rows):
+        """Entradas completas en el orden de una lista de filas ya ordenada."""
+        return self.materialize(row["_row"] for row in rows)
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import pickle
+from corpus import Corpus
+
+
+# ---------------- Caché del corpus parseado ----------------
+# Guarda junto al .bib (unificado.bib -> unificado.bib.cache) el corpus ya
+# parseado en columnas (ver corpus.py), incluidas las claves (año, título
+# normalizado), en formato pickle binario.
+# La caché es válida mientras el .bib no cambie: primero se compara tamaño y
+# mtime; si no coinciden se compara el hash SHA-256 del contenido.
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+
+
+def cache_path(input_file):
+    return input_file + CACHE_SUFFIX
+
+
+def file_hash(input_file):
+    sha = hashlib.sha256()
+    with open(input_file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _read_cache(path):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return None
+    return data
+
+
+def _write_cache(path, data):
+    # Escritura atómica: si el proceso se corta no queda una caché a medias
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_corpus(input_file):
+    """
+    Devuelve el Corpus del archivo usando la caché si el .bib no cambió,
+    o parseando y reconstruyendo la caché en caso contrario.
+    """
+    stat = os.stat(input_file)
+    path = cache_path(input_file)
+    data = _read_cache(path)
+
+    if data is not None and (data["size"], data["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        # El archivo fue tocado: solo se reutiliza si el contenido es el mismo
+        if data["size"] == stat.st_size and data["sha256"] == file_hash(input_file):
+            data["mtime_ns"] = stat.st_mtime_ns
+            _write_cache(path, data)
+        else:
+            data = None
+
+    if data is None:
+        data = {
+            "version": CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(input_file),
+            "columns": Corpus.from_bib(input_file).columns(),
+        }
+        _write_cache(path, data)
+
+    return Corpus.from_columns(data["columns"])
+
+
+def load_entries(input_file):
+    """Igual que bib_stream.load_entries pero pasando por la caché."""
+    # Entradas completas (se pueden escribir al .bib): no llevan la clave
+    # precalculada; para ordenar sin normalizar se usa Corpus.key_rows
+    return load_corpus(input_file).materialize()
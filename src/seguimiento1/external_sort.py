@@ -0,0 +1,158 @@
+import heapq
+import marshal
+import os
+import tempfile
+import time
+import bibtexparser
+from bibtexparser.bwriter import BibTexWriter
+from bib_stream import iter_bib_files
+from sort_keys import sort_key
+
+
+# ---------------- Ordenamiento externo ----------------
+# Para corpus que no caben en memoria (varios volcados de búsquedas de varios GB).
+# En lugar de cargar todo y escribir con BibTexWriter de una vez:
+#   1. se leen las entradas en streaming (bib_stream) desde uno o más .bib
+#   2. cada `run_size` entradas se ordenan en memoria y se vuelcan a un archivo
+#      temporal (una "corrida"), registro por registro con marshal
+#   3. las corridas se mezclan con un heap (k-way merge); si hay más de `fan_in`
+#      corridas se mezclan primero por grupos, para no abrir demasiados archivos
+#   4. la salida se escribe por bloques a medida que sale del heap
+# En memoria solo hay una corrida a la vez y, al mezclar, una entrada por corrida.
+# El orden es el mismo que el de los demás algoritmos (año, título, y a igualdad
+# de clave el orden de lectura), así que el resultado coincide con sort_bib_file.
+
+DEFAULT_RUN_SIZE = 10_000  # entradas por corrida
+DEFAULT_FAN_IN = 64        # corridas que se mezclan a la vez
+WRITE_BATCH = 500          # entradas por bloque al escribir la salida
+
+
+def _make_writer():
+    writer = BibTexWriter()
+    writer.indent = "    "
+    writer.order_entries_by = None
+    return writer
+
+
+def _write_run(records, tmp_dir):
+    """Vuelca una lista de (clave, entrada) ya ordenada; devuelve la ruta del archivo."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        for record in records:
+            marshal.dump(record, f)
+    return path
+
+
+def _read_run(path):
+    """Entrega los (clave, entrada) de una corrida, en orden, sin cargarla entera."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield marshal.load(f)
+            except EOFError:
+                return
+
+
+def make_runs(entries, tmp_dir, run_size=DEFAULT_RUN_SIZE):
+    """Parte el flujo de entradas en corridas ordenadas en disco; devuelve sus rutas en orden."""
+    runs = []
+    buffer = []
+    for entry in entries:
+        buffer.append((sort_key(entry), entry))
+        if len(buffer) >= run_size:
+            buffer.sort(key=lambda record: record[0])  # estable: respeta el orden de lectura
+            runs.append(_write_run(buffer, tmp_dir))
+            buffer = []
+    if buffer:
+        buffer.sort(key=lambda record: record[0])
+        runs.append(_write_run(buffer, tmp_dir))
+    return runs
+
+
+def merge_runs(runs):
+    """
+    K-way merge con heap de (clave, número de corrida, entrada).
+    A igualdad de clave gana la corrida anterior, así la mezcla es estable.
+    """
+    iterators = [_read_run(path) for path in runs]
+    heap = []
+    for run_number, iterator in enumerate(iterators):
+        for key, entry in iterator:
+            heap.append((key, run_number, entry))
+            break
+    heapq.heapify(heap)
+
+    while heap:
+        key, run_number, entry = heap[0]
+        yield key, entry
+        for next_key, next_entry in iterators[run_number]:
+            heapq.heapreplace(heap, (next_key, run_number, next_entry))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+def reduce_runs(runs, tmp_dir, fan_in=DEFAULT_FAN_IN):
+    """Mezcla grupos consecutivos de corridas hasta que queden como mucho fan_in."""
+    while len(runs) > fan_in:
+        merged = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            merged.append(_write_run(merge_runs(group), tmp_dir))
+            for path in group:
+                os.remove(path)
+        runs = merged
+    return runs
+
+
+def write_entries(entries, output_file, batch_size=WRITE_BATCH):
+    """Escribe las entradas por bloques; el resultado es idéntico a BibTexWriter.write de una vez."""
+    writer = _make_writer()
+    count = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                count = _write_batch(f, writer, batch, count)
+                batch = []
+        if batch:
+            count = _write_batch(f, writer, batch, count)
+    return count
+
+
+def _write_batch(f, writer, batch, count):
+    db = bibtexparser.bibdatabase.BibDatabase()
+    db.entries = batch
+    if count:
+        f.write(writer.entry_separator)
+    f.write(writer.write(db))
+    return count + len(batch)
+
+
+def external_sort(input_files, output_file, run_size=DEFAULT_RUN_SIZE, fan_in=DEFAULT_FAN_IN, tmp_dir=None):
+    """
+    Ordena uno o más .bib (año asc, título asc) con memoria acotada y escribe output_file.
+    input_files: ruta o lista de rutas. Los temporales se borran al terminar.
+    Devuelve {"entries": n, "runs": corridas iniciales}.
+    """
+    if isinstance(input_files, str):
+        input_files = [input_files]
+
+    with tempfile.TemporaryDirectory(prefix="external_sort_", dir=tmp_dir) as work_dir:
+        runs = make_runs(iter_bib_files(input_files), work_dir, run_size)
+        n_runs = len(runs)
+        runs = reduce_runs(runs, work_dir, fan_in)
+        count = write_entries((entry for _, entry in merge_runs(runs)), output_file)
+
+    return {"entries": count, "runs": n_runs}
+
+
+# ---------------- Ejecución directa ----------------
+if __name__ == "__main__":
+    INPUT = ["unificado.bib"]  # se pueden agregar más volcados
+    OUTPUT = "./files/unificado_ordenado_externo.bib"
+    start = time.time()
+    stats = external_sort(INPUT, OUTPUT)
+    print(f"✅ {stats['entries']} entradas ordenadas en {stats['runs']} corridas "
+          f"({time.time() - start:.2f} s); archivo guardado en {OUTPUT}")
@@ -1,75 +1,39 @@
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"[{}]", "", text)              # quitar llaves
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)    # quitar comandos LaTeX
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-
-# ---------------- Comparador ----------------
-def compare(entry1, entry2):
-    year1, year2 = int(entry1.get("year", 0)), int(entry2.get("year", 0))
-    if year1 < year2:
-        return -1
-    elif year1 > year2:
-        return 1
-    else:
-        title1 = normalize(entry1.get("title", ""))
-        title2 = normalize(entry2.get("title", ""))
-        if title1 < title2:
-            return -1
-        elif title1 > title2:
-            return 1
-        else:
-            return 0
+from corpus_cache import load_corpus
+from sort_keys import build_keys, index_list, apply_order
 
 
 # ---------------- Gnome Sort ----------------
-def gnome_sort(arr):
+def gnome_sort(entries):
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    arr = index_list(len(entries))
     n = len(arr)
     index = 0
     while index < n:
-        if index == 0 or compare(arr[index], arr[index - 1]) >= 0:
+        if index == 0 or keys[arr[index]] >= keys[arr[index - 1]]:
             index += 1
         else:
             arr[index], arr[index - 1] = arr[index - 1], arr[index]
             index -= 1
-    return arr
+    return apply_order(entries, arr)
 
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = gnome_sort(bib_database.entries)
+    sorted_rows = gnome_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -79,7 +43,7 @@ def sort_bib_file(input_file, output_file):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (GnomeSort): {elapsed:.6f} segundos")
-    print(f"📚 Número de entradas ordenadas: {len(bib_database.entries)}")
+    print(f"📚 Número de entradas ordenadas: {len(sorted_rows)}")
 
 
 # ---------------- Ejecución directa ----------------
@@ -1,96 +1,115 @@
+import heapq
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
+from corpus_cache import load_corpus
+from sort_keys import build_keys, index_list, apply_order
+
+
+# ---------------- HeapSort in-place ----------------
+# Max-heap sobre la lista de índices, sin lista de resultado aparte: cada
+# extracción deja el máximo al final de la zona del heap, así al terminar la
+# lista queda ordenada ascendente.
+# Las claves llevan el índice como desempate, con lo que el resultado es el
+# mismo que el de un ordenamiento estable.
+
+def sift_down(arr, start, end, keys):
+    """Hunde arr[start] dentro del max-heap arr[:end], moviendo el hueco en vez de hacer swaps."""
+    item = arr[start]
+    item_key = keys[item]
+    pos = start
+    child = 2 * pos + 1
+    while child < end:
+        right = child + 1
+        if right < end and keys[arr[child]] < keys[arr[right]]:
+            child = right
+        if not item_key < keys[arr[child]]:
+            break
+        arr[pos] = arr[child]
+        pos = child
+        child = 2 * pos + 1
+    arr[pos] = item
+
+
+def heapify(arr, keys):
+    """Construcción bottom-up de Floyd: O(n), hundiendo desde el último nodo interno."""
+    n = len(arr)
+    for start in range(n // 2 - 1, -1, -1):
+        sift_down(arr, start, n, keys)
+
+
+def sift_root_bottom_up(arr, item, end, keys):
+    """
+    Reubica item en la raíz del heap arr[:end] con el truco de Floyd: el hueco
+    baja hasta una hoja siguiendo al hijo mayor (una comparación por nivel) y
+    luego item sube desde ahí. Como item viene del fondo, casi no sube.
+    """
+    pos = 0
+    child = 1
+    while child < end:
+        right = child + 1
+        if right < end and keys[arr[child]] < keys[arr[right]]:
+            child = right
+        arr[pos] = arr[child]
+        pos = child
+        child = 2 * pos + 1
+
+    item_key = keys[item]
+    while pos > 0:
+        parent = (pos - 1) // 2
+        if not keys[arr[parent]] < item_key:
+            break
+        arr[pos] = arr[parent]
+        pos = parent
+    arr[pos] = item
 
 
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"[{}]", "", text)              # quitar llaves
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)    # quitar comandos LaTeX
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-
-# ---------------- Comparador ----------------
-def compare(entry1, entry2):
-    year1, year2 = int(entry1.get("year", 0)), int(entry2.get("year", 0))
-    if year1 < year2:
-        return -1
-    elif year1 > year2:
-        return 1
-    else:
-        title1 = normalize(entry1.get("title", ""))
-        title2 = normalize(entry2.get("title", ""))
-        if title1 < title2:
-            return -1
-        elif title1 > title2:
-            return 1
-        else:
-            return 0
-
-
-# ---------------- Heapify (ajustar heap) ----------------
-def heapify(arr, n, i):
-    smallest = i
-    left = 2 * i + 1
-    right = 2 * i + 2
-
-    if left < n and compare(arr[left], arr[smallest]) < 0:
-        smallest = left
-    if right < n and compare(arr[right], arr[smallest]) < 0:
-        smallest = right
-
-    if smallest != i:
-        arr[i], arr[smallest] = arr[smallest], arr[i]
-        heapify(arr, n, smallest)
-
-
-# ---------------- HeapSort ----------------
 def heap_sort(entries):
-    n = len(entries)
+    keys = [(key, i) for i, key in enumerate(build_keys(entries))]  # claves con desempate
+    heap = index_list(len(entries))
 
-    # Construir min-heap
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(entries, n, i)
+    heapify(heap, keys)
+    for end in range(len(heap) - 1, 0, -1):
+        # el máximo pasa al final; el último elemento se reubica desde la raíz
+        item = heap[end]
+        heap[end] = heap[0]
+        sift_root_bottom_up(heap, item, end, keys)
 
-    result = []
-    for i in range(n - 1, -1, -1):
-        # mover raíz (mínimo) al final
-        entries[0], entries[i] = entries[i], entries[0]
-        result.insert(0, entries[i])  # insertar ordenado
-        heapify(entries, i, 0)
+    return apply_order(entries, heap)
 
-    return result
+
+# ---------------- Top-k con heapq ----------------
+# Para los tableros basta con las k más antiguas o más nuevas: heapq mantiene un
+# heap de tamaño k, O(n log k), sin ordenar todo el corpus.
+
+def oldest(entries, k):
+    """Las k entradas más antiguas (año asc, título asc)."""
+    keys = build_keys(entries)
+    order = heapq.nsmallest(k, range(len(entries)), key=keys.__getitem__)
+    return apply_order(entries, order)
+
+
+def newest(entries, k):
+    """Las k entradas más recientes (año desc; dentro del año, título asc)."""
+    keys = [(-year, title) for year, title in build_keys(entries)]
+    order = heapq.nsmallest(k, range(len(entries)), key=keys.__getitem__)
+    return apply_order(entries, order)
 
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = heap_sort(bib_database.entries)
+    sorted_rows = heap_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -100,7 +119,7 @@ def sort_bib_file(input_file, output_file):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (HeapSort): {elapsed:.6f} segundos")
-    print(f"📚 Total de entradas ordenadas: {len(sorted_entries)}")
+    print(f"📚 Total de entradas ordenadas: {len(sorted_rows)}")
 
 
 # ---------------- Ejecución directa ----------------
@@ -0,0 +1,319 @@
+import operator
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+import matplotlib.pyplot as plt
+import sort_keys
+from bitonic_sort import bitonic_sort_numpy
+from numpy_sort import numpy_sort
+
+
+# ---------------- Instrumentación de funciones de clave y comparación ----------------
+# Un Tracer envuelve, en el módulo del algoritmo y en sort_keys, las funciones
+# registradas en HOOKS (normalización, construcción de claves, comparadores) y
+# las claves que devuelven build_keys / build_key_columns / encode_key, cuyas
+# comparaciones también se cuentan y se miden.
+# Cada llamada se cronometra de forma exclusiva (sin el tiempo de las llamadas
+# anidadas), así el tiempo total del algoritmo se reparte en:
+#   normalización | claves | comparación | movimiento de datos (el resto)
+# Se descuenta el costo del propio cronómetro, calibrado al crear el Tracer.
+# En los algoritmos de VECTORIZED las claves no se envuelven: las comparaciones
+# del orden ocurren en NumPy y las que se verían desde Python son las del
+# preprocesamiento (el sorted de title_ranks), no las del algoritmo.
+# El tiempo instrumentado es mayor que el real: sirve para repartirlo, no para
+# compararlo con benchmark.py.
+
+NORMALIZATION = "normalización"
+KEYS = "claves"
+COMPARISON = "comparación"
+MOVEMENT = "movimiento de datos"
+CATEGORIES = (NORMALIZATION, KEYS, COMPARISON, MOVEMENT)
+
+# nombre en el módulo -> (categoría, cómo envolver el resultado)
+#   "keys": lista de claves; "columns": tupla de columnas; "key": una clave; None: no se envuelve
+HOOKS = {
+    "normalize": (NORMALIZATION, None),
+    "clean_latex_text": (NORMALIZATION, None),
+    "sort_key": (KEYS, None),
+    "get_key": (KEYS, None),
+    "build_keys": (KEYS, "keys"),
+    "build_key_columns": (KEYS, "columns"),
+    "encode_key": (KEYS, "key"),
+    "compare_keys": (COMPARISON, None),
+}
+
+# Ordenan dentro de NumPy; profiling.py tampoco cuenta sus comparaciones
+VECTORIZED = {numpy_sort, bitonic_sort_numpy}
+
+KEY_COMPARISON = "<clave>"  # nombre con el que se reportan las comparaciones entre claves
+
+
+def register_hook(name, category, wrap=None):
+    """Agrega (o cambia) una función a instrumentar en los módulos de los algoritmos."""
+    if category not in CATEGORIES:
+        raise ValueError(f"Categoría desconocida: {category}")
+    HOOKS[name] = (category, wrap)
+
+
+@contextmanager
+def patched(replacements):
+    """
+    Reemplaza temporalmente nombres en dicts de globals.
+    replacements: lista de (globals, {nombre: nuevo valor}); solo se tocan los nombres que existen.
+    """
+    saved = []
+    for namespace, values in replacements:
+        for name, value in values.items():
+            if name in namespace:
+                saved.append((namespace, name, namespace[name]))
+                namespace[name] = value
+    try:
+        yield sorted({name for _, name, _ in saved})
+    finally:
+        for namespace, name, original in reversed(saved):
+            namespace[name] = original
+
+
+class Tracer:
+    def __init__(self):
+        self.calls = Counter()       # llamadas por función instrumentada
+        self.time_ns = Counter()     # tiempo exclusivo por categoría
+        self._children = []          # pila: tiempo de llamadas anidadas de cada nivel
+        # costo del cronómetro: (dentro de la medición, visto desde afuera), calibrado
+        # por separado para funciones envueltas y para comparaciones de claves
+        self._call_overhead = (0, 0)
+        self._compare_overhead = (0, 0)
+        self._calibrate()
+
+    def _calibrate(self, rounds=5000, batches=5):
+        # Se queda con el lote más barato: el ruido solo puede sumar tiempo
+        noop = self.wrap("__calibracion__", MOVEMENT, lambda: None)
+        key = InstrumentedKey(0, self.compare)
+        for attr, run in (("_call_overhead", noop), ("_compare_overhead", lambda: key < 0)):
+            best = None
+            for _ in range(batches):
+                self.time_ns.clear()
+                start = time.perf_counter_ns()
+                for _ in range(rounds):
+                    run()
+                outer = (time.perf_counter_ns() - start) / rounds
+                inner = sum(self.time_ns.values()) / rounds
+                if best is None or outer < best[1]:
+                    best = (inner, outer)
+            setattr(self, attr, best)
+        self.calls.clear()
+        self.time_ns.clear()
+
+    def _record(self, name, category, elapsed, overhead):
+        children = self._children.pop()
+        self.calls[name] += 1
+        self.time_ns[category] += elapsed - children
+        if self._children:
+            # el padre no debe contar como propio este tiempo ni el costo de medirlo
+            inner, outer = overhead
+            self._children[-1] += elapsed + outer - inner
+
+    def wrap(self, name, category, func):
+        def timed(*args, **kwargs):
+            self._children.append(0)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(name, category, time.perf_counter_ns() - start, self._call_overhead)
+        return timed
+
+    def compare(self, op, a, b):
+        self._children.append(0)
+        start = time.perf_counter_ns()
+        try:
+            return op(a, b)
+        finally:
+            self._record(KEY_COMPARISON, COMPARISON, time.perf_counter_ns() - start, self._compare_overhead)
+
+    def hooks(self, namespace, wrap_keys_results=True):
+        """
+        Reemplazos para patched(): las funciones de HOOKS que hay en namespace, envueltas.
+        Con wrap_keys_results=False se cronometran igual pero sus claves no se envuelven.
+        """
+        def make(name, category, wrap, original):
+            timed = self.wrap(name, category, original)
+            if wrap is None or not wrap_keys_results:
+                return timed
+            return lambda *args, **kwargs: wrap_keys(wrap, timed(*args, **kwargs), self.compare)
+
+        return {
+            name: make(name, category, wrap, namespace[name])
+            for name, (category, wrap) in HOOKS.items()
+            if name in namespace
+        }
+
+    def breakdown(self, total_ns):
+        """Segundos por categoría; el movimiento de datos es lo que no es clave ni comparación."""
+        seconds = {c: self.time_ns[c] for c in CATEGORIES[:3]}
+        instrumentation = 0
+        for name, n in self.calls.items():
+            inner, outer = self._compare_overhead if name == KEY_COMPARISON else self._call_overhead
+            seconds[_category_of(name)] -= inner * n
+            instrumentation += outer * n
+        seconds = {c: max(0.0, ns) / 1e9 for c, ns in seconds.items()}
+        seconds[MOVEMENT] = max(0.0, (total_ns - instrumentation) / 1e9 - sum(seconds.values()))
+        return seconds
+
+
+def _category_of(name):
+    if name == KEY_COMPARISON:
+        return COMPARISON
+    return HOOKS[name][0]
+
+
+class InstrumentedKey:
+    """
+    Clave (o valor de una columna de clave) que pasa cada comparación por un hook:
+    hook(op, a, b) debe devolver op(a, b). El Tracer la usa para contar y
+    cronometrar comparaciones, profiling.Counters para solo contarlas.
+    """
+    __slots__ = ("value", "hook")
+
+    def __init__(self, value, hook):
+        self.value = value
+        self.hook = hook
+
+    def __lt__(self, other):
+        return self.hook(operator.lt, self.value, _value(other))
+
+    def __le__(self, other):
+        return self.hook(operator.le, self.value, _value(other))
+
+    def __gt__(self, other):
+        return self.hook(operator.gt, self.value, _value(other))
+
+    def __ge__(self, other):
+        return self.hook(operator.ge, self.value, _value(other))
+
+    def __eq__(self, other):
+        return self.hook(operator.eq, self.value, _value(other))
+
+    def __ne__(self, other):
+        return self.hook(operator.ne, self.value, _value(other))
+
+    def __hash__(self):
+        return hash(self.value)
+
+    # La clave se sigue pudiendo desempaquetar (year, title = key) e indexar
+    def __iter__(self):
+        return iter(self.value)
+
+    def __getitem__(self, i):
+        return self.value[i]
+
+    def __len__(self):
+        return len(self.value)
+
+    # Aritmética de las columnas de año (bucket y pigeonhole restan el mínimo)
+    def __sub__(self, other):
+        return self.value - _value(other)
+
+    def __rsub__(self, other):
+        return _value(other) - self.value
+
+    def __index__(self):
+        return self.value
+
+
+def _value(x):
+    return x.value if isinstance(x, InstrumentedKey) else x
+
+
+def wrap_keys(kind, result, hook):
+    """Envuelve en InstrumentedKey el resultado de un helper de claves ("keys", "columns" o "key")."""
+    if kind == "keys":
+        return [InstrumentedKey(key, hook) for key in result]
+    if kind == "columns":
+        return tuple([InstrumentedKey(value, hook) for value in column] for column in result)
+    if kind == "key":
+        return InstrumentedKey(result, hook)
+    return result
+
+
+# ---------------- Ejecución instrumentada ----------------
+def _without_key(entry):
+    return {field: value for field, value in entry.items() if field != sort_keys.KEY_FIELD}
+
+
+def trace_algorithm(algo, entries, precomputed=True):
+    """
+    Corre algo una vez instrumentado. Con precomputed=False las entradas se copian
+    sin su clave precalculada (KEY_FIELD), así se mide la normalización.
+    Devuelve {"total": s, "breakdown": {categoría: s}, "calls": {función: n}}.
+    """
+    data = list(entries) if precomputed else [_without_key(entry) for entry in entries]
+    tracer = Tracer()
+    namespaces = [algo.__globals__, vars(sort_keys)]
+    wrap_results = algo not in VECTORIZED
+    with patched([(namespace, tracer.hooks(namespace, wrap_results)) for namespace in namespaces]):
+        start = time.perf_counter_ns()
+        algo(data)
+        total_ns = time.perf_counter_ns() - start
+
+    return {"total": total_ns / 1e9, "breakdown": tracer.breakdown(total_ns), "calls": dict(tracer.calls)}
+
+
+def trace_algorithms(entries, algorithms, precomputed=True):
+    traces = {}
+    for name, algo in algorithms.items():
+        traces[name] = trace_algorithm(algo, entries, precomputed)
+    return traces
+
+
+# ---------------- Reporte ----------------
+def print_breakdown(traces):
+    header = f"{'Algoritmo':<20} {'Total (s)':>10} " + " ".join(f"{c:>20}" for c in CATEGORIES)
+    print(header)
+    print("-" * len(header))
+    for name, trace in traces.items():
+        total = sum(trace["breakdown"].values()) or 1
+        cells = " ".join(f"{trace['breakdown'][c]:>10.4f} s ({trace['breakdown'][c] / total:>4.0%})" for c in CATEGORIES)
+        print(f"{name:<20} {trace['total']:>10.4f} {cells}")
+        calls = ", ".join(f"{f}={n:,}" for f, n in sorted(trace["calls"].items(), key=lambda x: -x[1]))
+        print(f"{'':<20} llamadas: {calls}")
+
+
+def plot_breakdown(traces, save_path):
+    """Barras apiladas: reparto del tiempo de cada algoritmo por categoría."""
+    names = list(traces)
+    colors = {NORMALIZATION: "salmon", KEYS: "gold", COMPARISON: "skyblue", MOVEMENT: "mediumseagreen"}
+    bottom = [0.0] * len(names)
+    plt.figure(figsize=(12, 6))
+    for category in CATEGORIES:
+        values = [traces[n]["breakdown"][category] for n in names]
+        plt.bar(names, values, bottom=bottom, label=category, color=colors[category])
+        bottom = [b + v for b, v in zip(bottom, values)]
+    plt.ylabel("Tiempo instrumentado (segundos)")
+    plt.title("¿En qué se va el tiempo de cada algoritmo?")
+    plt.xticks(rotation=45, ha="right")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Gráfica guardada en {save_path}")
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    from benchmark import ALGORITHMS, get_entries
+
+    INPUT = "unificado.bib"
+    SAMPLE_SIZE = 2000  # los algoritmos cuadráticos instrumentados son lentos con el corpus entero
+    entries = get_entries(INPUT)
+    if len(entries) > SAMPLE_SIZE:
+        entries = random.Random(42).sample(entries, SAMPLE_SIZE)
+
+    print("== Sin claves precalculadas (normaliza en cada corrida) ==")
+    traces = trace_algorithms(entries, ALGORITHMS, precomputed=False)
+    print_breakdown(traces)
+    plot_breakdown(traces, "./files/benchmark_breakdown.png")
+
+    print("\n== Con claves precalculadas (caché del corpus) ==")
+    print_breakdown(trace_algorithms(entries, ALGORITHMS, precomputed=True))
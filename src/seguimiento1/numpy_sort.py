@@ -0,0 +1,70 @@
+import time
+import numpy as np
+import bibtexparser
+from bibtexparser.bwriter import BibTexWriter
+from corpus_cache import load_corpus
+from sort_keys import build_keys, apply_order
+
+
+# ---------------- Ordenamiento vectorizado con NumPy ----------------
+# Misma relación de orden que los demás algoritmos (año asc, título asc):
+# los títulos normalizados se factorizan en rangos enteros y np.lexsort
+# ordena por (año, rango) en C. Es estable, así que ante claves iguales se
+# respeta el orden de entrada. Sirve como referencia en el benchmark, y
+# sort_bib_file de este módulo es el camino recomendado para generar el .bib
+# ordenado. No hay otro paso del pipeline que ordene: merge_bib_files escribe
+# unificado.bib en el orden de descarga y cada módulo de algoritmo tiene su
+# propio sort_bib_file de demostración, que se deja como está.
+
+def title_ranks(titles):
+    """Rango entero de cada título: mismo orden que la comparación de strings de Python."""
+    # Se factoriza sobre los títulos distintos (sorted de Python, sin el relleno
+    # de ancho fijo que tendría un array dtype=str)
+    rank = {title: i for i, title in enumerate(sorted(set(titles)))}
+    return np.fromiter((rank[title] for title in titles), dtype=np.int64, count=len(titles))
+
+def lexsort_order(years, titles):
+    """Permutación que ordena por (año, título). years puede ser lista, array('H') o ndarray."""
+    if len(titles) == 0:
+        return np.empty(0, dtype=np.intp)
+    years = np.asarray(years, dtype=np.int64)
+    # lexsort usa la última clave como primaria
+    return np.lexsort((title_ranks(titles), years))
+
+def numpy_sort(entries):
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    years = np.fromiter((year for year, _ in keys), dtype=np.int64, count=len(keys))
+    order = lexsort_order(years, [title for _, title in keys])
+    return apply_order(entries, order.tolist())
+
+
+# ---------------- Función principal ----------------
+def sort_bib_file(input_file, output_file):
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+
+    # medir tiempo: se ordena directamente sobre las columnas del corpus
+    start = time.perf_counter()
+    order = lexsort_order(np.frombuffer(corpus.years, dtype=np.uint16), corpus.titles)
+    end = time.perf_counter()
+    elapsed = end - start
+
+    # guardar archivo
+    db_sorted = bibtexparser.bibdatabase.BibDatabase()
+    db_sorted.entries = corpus.materialize(order.tolist())
+
+    writer = BibTexWriter()
+    writer.indent = "    "
+    writer.order_entries_by = None
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(writer.write(db_sorted))
+
+    print(f"✅ Archivo ordenado guardado en {output_file}")
+    print(f"⏱️ Tiempo de ordenamiento (NumPy lexsort): {elapsed:.6f} segundos")
+    print(f"📚 Total de entradas ordenadas: {len(order)}")
+
+
+# ---------------- Ejecución directa ----------------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    OUTPUT = "./files/unificado_ordenado_numpy.bib"
+    sort_bib_file(INPUT, OUTPUT)
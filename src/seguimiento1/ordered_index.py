@@ -0,0 +1,148 @@
+import os
+import pickle
+import bibtexparser
+from bibtexparser.bwriter import BibTexWriter
+from bib_stream import iter_bib_entries
+from sort_keys import sort_key
+from tree_sort import AVLNode, avl_insert, update_height
+
+
+# ---------------- Índice ordenado persistente ----------------
+# Mantiene el corpus ordenado por (año, título) en un árbol AVL, de modo que las
+# entradas nuevas de cada scraping se insertan una por una en O(log n) en lugar
+# de volver a ordenar todo el corpus.
+# En disco se guarda la secuencia ya ordenada; al cargarla el árbol se rearma
+# perfectamente balanceado en O(n), sin comparar claves.
+# Una entrada ya está en el índice si coincide su identidad (ID, título
+# normalizado, DOI), no solo el ID: hay IDs BibTeX repetidos entre bases que
+# corresponden a publicaciones distintas (ASHRAF2024, 20253, ...).
+
+INDEX_VERSION = 1
+
+
+def entry_identity(entry, key=None):
+    """(ID, título normalizado, DOI) de una entrada; key es su sort_key si ya se calculó."""
+    if key is None:
+        key = sort_key(entry)
+    return entry.get("ID", ""), key[1], (entry.get("doi") or "").strip().lower()
+
+
+class OrderedIndex:
+    def __init__(self):
+        self.root = None
+        self.identities = set()  # entry_identity de las entradas indexadas (para no duplicar)
+
+    def __len__(self):
+        return len(self.identities)
+
+    def __contains__(self, entry):
+        return entry_identity(entry) in self.identities
+
+    def insert(self, entry, key=None):
+        """Inserta una entrada (si no está ya). Devuelve True si la insertó."""
+        if key is None:
+            key = sort_key(entry)
+        identity = entry_identity(entry, key)
+        if identity in self.identities:
+            return False
+        self.root = avl_insert(self.root, entry, key)
+        self.identities.add(identity)
+        return True
+
+    def extend(self, entries):
+        """Inserta varias entradas; devuelve cuántas eran nuevas."""
+        return sum(self.insert(entry) for entry in entries)
+
+    def _nodes(self):
+        """Nodos en orden (recorrido in-order con pila explícita)."""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def __iter__(self):
+        """Entradas en orden (año asc, título asc)."""
+        return (node.entry for node in self._nodes())
+
+    def items(self):
+        """Pares (clave, entrada) en orden."""
+        return ((node.key, node.entry) for node in self._nodes())
+
+    @property
+    def height(self):
+        return self.root.height if self.root is not None else 0
+
+    # ---------- Persistencia ----------
+    @classmethod
+    def from_sorted(cls, items):
+        """Árbol perfectamente balanceado a partir de pares (clave, entrada) ya ordenados."""
+        index = cls()
+        items = list(items)
+
+        def build(lo, hi):  # profundidad log2(n): no hay riesgo de recursión
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            key, entry = items[mid]
+            node = AVLNode(entry, key)
+            node.left = build(lo, mid)
+            node.right = build(mid + 1, hi)
+            update_height(node)
+            return node
+
+        index.root = build(0, len(items))
+        index.identities = {entry_identity(entry, key) for key, entry in items}
+        return index
+
+    def save(self, path):
+        # Escritura atómica, igual que la caché del corpus
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "items": list(self.items())}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carga el índice guardado; si no existe o es de otra versión, devuelve uno vacío."""
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return cls()
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return cls()
+        return cls.from_sorted(data["items"])
+
+    def write_bib(self, output_file):
+        db = bibtexparser.bibdatabase.BibDatabase()
+        db.entries = list(self)
+        writer = BibTexWriter()
+        writer.indent = "    "
+        writer.order_entries_by = None
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(writer.write(db))
+
+
+def update_index(index_path, bib_file):
+    """Agrega al índice guardado las entradas de bib_file que aún no tiene."""
+    index = OrderedIndex.load(index_path)
+    added = index.extend(iter_bib_entries(bib_file))
+    index.save(index_path)
+    return index, added
+
+
+# ---------------- Ejecución directa ----------------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    INDEX = "./files/indice_ordenado.pkl"
+    OUTPUT = "./files/unificado_ordenado_indice.bib"
+    index, added = update_index(INDEX, INPUT)
+    index.write_bib(OUTPUT)
+    print(f"✅ Índice actualizado en {INDEX}: {added} entradas nuevas, {len(index)} en total (altura {index.height})")
+    print(f"✅ Archivo ordenado guardado en {OUTPUT}")
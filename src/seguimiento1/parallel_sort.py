@@ -0,0 +1,156 @@
+import bisect
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from sort_keys import KEY_FIELD, build_key_columns, build_keys, apply_order
+
+
+# ---------------- Sample sort en paralelo ----------------
+# 1. se toma una muestra de claves (año, título) y se eligen workers-1 separadores
+# 2. cada entrada va a la partición que le toca según los separadores (bisect),
+#    así todas las claves de la partición p son <= que las de la p+1
+# 3. cada partición se ordena en un proceso del pool con cualquiera de los
+#    algoritmos de benchmark.ALGORITHMS
+# 4. el resultado es la concatenación de las particiones en orden
+# A los procesos no viajan los dicts de las entradas: solo columnas compactas
+# (años en array('i'), títulos normalizados e índices en array('i')). Cada proceso
+# arma filas livianas con su clave precalculada y devuelve la permutación.
+# Las claves iguales caen siempre en la misma partición y las particiones no se
+# solapan, así que concatenarlas da un orden válido aunque el algoritmo no sea
+# estable (a igual clave el orden puede variar, como en su versión secuencial).
+# Cada proceso verifica que su partición quedó con claves no decrecientes: un
+# algoritmo que ordena con otra clave se rechaza con ValueError en lugar de
+# concatenar particiones fuera de orden.
+
+DEFAULT_OVERSAMPLE = 32  # claves muestreadas por partición para elegir separadores
+
+
+def choose_splitters(keys, parts, oversample=DEFAULT_OVERSAMPLE, seed=42):
+    """parts-1 claves que parten la muestra ordenada en trozos de igual tamaño."""
+    if parts <= 1 or not keys:
+        return []
+    sample = sorted(random.Random(seed).sample(keys, min(len(keys), parts * oversample)))
+    return [sample[p * len(sample) // parts] for p in range(1, parts)]
+
+
+def partition(years, titles, splitters):
+    """Columnas (años, títulos, índices) de cada partición, en el orden de entrada."""
+    parts = [(array("i"), [], array("i")) for _ in range(len(splitters) + 1)]
+    for i, key in enumerate(zip(years, titles)):
+        part_years, part_titles, part_indices = parts[bisect.bisect_right(splitters, key)]
+        part_years.append(key[0])
+        part_titles.append(key[1])
+        part_indices.append(i)
+    return parts
+
+
+def partition_rows(years, titles, indices):
+    """Filas livianas con su clave; como en Corpus.key_rows, sin year si la entrada no tiene año."""
+    rows = []
+    for year, title, i in zip(years, titles, indices):
+        row = {"title": title, "_row": i, KEY_FIELD: (year, title)}
+        if year:
+            row["year"] = str(year)
+        rows.append(row)
+    return rows
+
+
+def check_partition(rows):
+    """ValueError si las claves de las filas ordenadas decrecen en algún punto."""
+    for previous, row in zip(rows, rows[1:]):
+        if previous[KEY_FIELD] > row[KEY_FIELD]:
+            raise ValueError("el algoritmo no ordena por la clave (año, título) de sort_keys: "
+                             "sus particiones no se pueden concatenar")
+
+
+def sort_partition(task):
+    """Cuerpo de cada proceso: ordena una partición y devuelve sus índices globales en orden."""
+    algo, years, titles, indices = task
+    rows = algo(partition_rows(years, titles, indices))
+    check_partition(rows)
+    return array("i", [row["_row"] for row in rows])
+
+
+def resolve_algorithm(algorithm):
+    """Acepta la función o su nombre en benchmark.ALGORITHMS."""
+    if callable(algorithm):
+        return algorithm
+    from benchmark import ALGORITHMS  # import diferido: benchmark importa este módulo
+    try:
+        return ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Algoritmo desconocido: {algorithm}") from None
+
+
+def parallel_sort(entries, algorithm="QuickSort", workers=None, oversample=DEFAULT_OVERSAMPLE):
+    """Ordena entries repartiendo particiones entre `workers` procesos (por defecto, uno por núcleo)."""
+    algo = resolve_algorithm(algorithm)
+    workers = workers or os.cpu_count() or 1
+    years, titles = build_key_columns(entries)
+    keys = list(zip(years, titles))
+    parts = partition(years, titles, choose_splitters(keys, workers, oversample))
+    tasks = [(algo, *part) for part in parts if part[2]]
+
+    if workers == 1:
+        sorted_parts = [sort_partition(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks) or 1)) as pool:
+            sorted_parts = pool.map(sort_partition, tasks, chunksize=1)
+
+    order = array("i")
+    for part in sorted_parts:
+        order.extend(part)
+    return apply_order(entries, order)
+
+
+# ---------------- Speedup ----------------
+def speedup_report(entries, algorithms=("QuickSort",), workers_list=(1, 2, 4), repetitions=3):
+    """
+    Mejor tiempo del algoritmo secuencial y de parallel_sort con distinta cantidad
+    de procesos; el speedup es contra la versión secuencial. Antes de medir se
+    verifica con check_parallel que ambos dan el mismo orden.
+    Devuelve {algoritmo: {"sequential": s, workers: s, ...}}.
+    """
+    report = {}
+    for name in algorithms:
+        algo = resolve_algorithm(name)
+        for workers in workers_list:
+            check_parallel(entries, algo, workers)
+        best = {"sequential": min(_timed(algo, entries) for _ in range(repetitions))}
+        print(f"{name} secuencial: {best['sequential']:.6f} s")
+        for workers in workers_list:
+            best[workers] = min(_timed(lambda data: parallel_sort(data, algo, workers), entries)
+                                for _ in range(repetitions))
+            print(f"{name} con {workers} proceso(s): {best[workers]:.6f} s "
+                  f"(speedup {best['sequential'] / best[workers]:.2f}x)")
+        report[name] = best
+    return report
+
+
+def check_parallel(entries, algorithm="QuickSort", workers=None):
+    """
+    ValueError si parallel_sort no da la misma secuencia de claves que el algoritmo
+    secuencial. Se comparan claves y no entradas: con un algoritmo no estable las
+    entradas de igual clave pueden quedar en otro orden y el resultado sigue siendo válido.
+    """
+    algo = resolve_algorithm(algorithm)
+    if build_keys(parallel_sort(list(entries), algo, workers)) != build_keys(algo(list(entries))):
+        raise ValueError(f"parallel_sort con {workers} proceso(s) no coincide con el orden secuencial")
+
+
+def _timed(sort, entries):
+    data = list(entries)
+    start = time.perf_counter()
+    sort(data)
+    return time.perf_counter() - start
+
+
+# ---------------- Ejecución directa ----------------
+if __name__ == "__main__":
+    from benchmark import get_entries
+
+    INPUT = "unificado.bib"
+    entries = get_entries(INPUT)
+    speedup_report(entries, algorithms=("QuickSort", "HeapSort", "BinaryInsertionSort"))
@@ -0,0 +1,283 @@
+import operator
+import random
+import tracemalloc
+from contextlib import contextmanager
+import matplotlib.pyplot as plt
+from benchmark import ALGORITHMS, benchmark, get_entries
+from instrumentation import HOOKS, VECTORIZED, patched, wrap_keys
+
+
+# ---------------- Perfil de memoria y operaciones ----------------
+# Para cada algoritmo se hacen dos corridas sobre la misma entrada:
+#   1. sin instrumentar, bajo tracemalloc: pico de memoria y memoria retenida
+#   2. instrumentada: se reemplazan, solo en el módulo del algoritmo y solo
+#      mientras dura la corrida, los constructores de claves (los de HOOKS que
+#      devuelven claves), sort_keys.index_list y las clases de nodo del árbol,
+#      así los algoritmos no cambian y la medición de tiempos no se ve afectada.
+# Cada conteo mide lo mismo en todos los algoritmos (ver METRICS); si un
+# algoritmo no hace esa operación de forma observable se reporta "-", no 0.
+
+METRICS = {
+    "comparisons": "comparaciones entre claves hechas en Python (hook de InstrumentedKey); "
+                   "una tupla decorada (clave, i) cuenta una vez. '-' si el orden se decide "
+                   "en NumPy o las claves no pasan por un constructor instrumentable",
+    "swaps": "intercambios de dos posiciones de una lista de índices (dos escrituras "
+             "seguidas que se devuelven los valores); '-' sin listas de índices",
+    "moves": "escrituras de índices en las listas de index_list (cada swap son dos; "
+             "insert/pop suman los desplazados) o enlaces left/right reescritos en los "
+             "nodos del árbol; '-' si no hay ninguna de las dos estructuras",
+    "copies": "índices copiados por slicing o concatenación de listas de índices; '-' sin ellas",
+    "allocations": "estructuras auxiliares creadas: listas de índices (index_list, slicing, "
+                   "concatenación) y nodos del árbol; '-' si no hay ninguna de las dos",
+}
+
+# Los algoritmos de VECTORIZED (instrumentation.py) ordenan dentro de NumPy: no
+# se envuelven sus claves, así no se cuentan las comparaciones del
+# preprocesamiento (el sorted de title_ranks) como si fueran del algoritmo.
+
+# Constructores de claves que se instrumentan: {nombre: cómo envolver el resultado}
+KEY_BUILDERS = {name: wrap for name, (_, wrap) in HOOKS.items() if wrap is not None}
+NODE_CLASSES = ("Node", "AVLNode")
+LINKS = ("left", "right")
+
+
+class Counters:
+    __slots__ = (*METRICS, "used")
+
+    def __init__(self):
+        for name in METRICS:
+            setattr(self, name, 0)
+        self.used = set()  # helpers instrumentados que el algoritmo llamó de verdad
+
+    def compare(self, op, a, b):
+        """
+        Hook de InstrumentedKey. Al comparar tuplas (clave, i) Python hace == y, si
+        las claves difieren, el operador de orden sobre el mismo par: el == que da
+        False no se cuenta porque siempre lo sigue la comparación que sí se cuenta.
+        (Los algoritmos no comparan claves con == directamente.)
+        """
+        result = op(a, b)
+        if op is not operator.eq or result:
+            self.comparisons += 1
+        return result
+
+    def as_dict(self):
+        """Conteos por métrica; None ("-") si el algoritmo no usó lo que la mide."""
+        counts = {name: getattr(self, name) for name in METRICS}
+        if not set(KEY_BUILDERS) & self.used:
+            counts["comparisons"] = None
+        if "index_list" not in self.used:
+            counts["swaps"] = counts["copies"] = None
+        if not {"index_list", "nodes"} & self.used:
+            counts["moves"] = counts["allocations"] = None
+        return counts
+
+
+class CountingList(list):
+    """Lista de índices que cuenta swaps, movimientos, copias y listas nuevas."""
+    __slots__ = ("counters", "_last_write")
+
+    def __init__(self, iterable=(), counters=None):
+        super().__init__(iterable)
+        self.counters = counters
+        self.counters.allocations += 1
+        self._last_write = None
+
+    def _new(self, items):
+        self.counters.copies += len(items)
+        return CountingList(items, self.counters)
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            value = list(value)
+            self.counters.moves += len(value)
+            super().__setitem__(i, value)
+            self._last_write = None
+            return
+        self.counters.moves += 1
+        old = self[i]
+        last = self._last_write
+        # Segunda mitad de un swap: se escribe en j lo que había en i, y en i
+        # se había escrito lo que había en j (los índices de la lista son únicos)
+        if last is not None and last[0] != i and last[1] == value and last[2] == old:
+            self.counters.swaps += 1
+            self._last_write = None
+        else:
+            self._last_write = (i, old, value)
+        super().__setitem__(i, value)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._new(super().__getitem__(i))
+        return super().__getitem__(i)
+
+    def __add__(self, other):
+        return self._new(list.__add__(self, list(other)))
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    # Cualquier otra escritura corta un posible swap en curso
+    def append(self, value):
+        self.counters.moves += 1
+        self._last_write = None
+        super().append(value)
+
+    def extend(self, values):
+        values = list(values)
+        self.counters.moves += len(values)
+        self._last_write = None
+        super().extend(values)
+
+    def insert(self, i, value):
+        # insertar desplaza todos los elementos a la derecha de i
+        self.counters.moves += len(self) - min(max(i, 0), len(self)) + 1
+        self._last_write = None
+        super().insert(i, value)
+
+    def pop(self, i=-1):
+        if i != -1:
+            self.counters.moves += len(self) - (i % len(self)) - 1
+        self._last_write = None
+        return super().pop(i)
+
+
+def counting_node(node_class, counters):
+    """Subclase de node_class que cuenta los nodos creados y los enlaces reescritos."""
+    class CountingNode(node_class):
+        __slots__ = ("_linked",)
+
+        def __init__(self, *args):
+            super().__init__(*args)
+            counters.used.add("nodes")
+            counters.allocations += 1
+            self._linked = True  # desde aquí cada enlace que se escribe es un movimiento
+
+        def __setattr__(self, name, value):
+            if name in LINKS and getattr(self, "_linked", False):
+                counters.moves += 1
+            super().__setattr__(name, value)
+
+    return CountingNode
+
+
+def _instrumented_helpers(namespace, counters, count_comparisons=True):
+    def index_list(n=0):
+        counters.used.add("index_list")
+        return CountingList(range(n), counters)
+
+    def key_builder(name, wrap):
+        original = namespace[name]
+
+        def build(*args, **kwargs):
+            counters.used.add(name)
+            return wrap_keys(wrap, original(*args, **kwargs), counters.compare)
+        return build
+
+    replacements = {"index_list": index_list}
+    if count_comparisons:
+        replacements.update({name: key_builder(name, wrap) for name, wrap in KEY_BUILDERS.items()
+                             if name in namespace})
+    for name in NODE_CLASSES:
+        if isinstance(namespace.get(name), type):
+            replacements[name] = counting_node(namespace[name], counters)
+    return replacements
+
+
+@contextmanager
+def instrument(algo, counters):
+    """Reemplaza temporalmente los helpers de sort_keys y las clases de nodo en el módulo de algo."""
+    namespace = algo.__globals__
+    helpers = _instrumented_helpers(namespace, counters, count_comparisons=algo not in VECTORIZED)
+    with patched([(namespace, helpers)]):
+        yield
+
+
+# ---------------- Medición ----------------
+def measure_memory(algo, entries):
+    """Pico y memoria retenida (bytes) de una corrida sin instrumentar."""
+    data = list(entries)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = algo(data)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak, "retained_bytes": current}
+
+
+def count_operations(algo, entries):
+    """Comparaciones, swaps, movimientos, copias y estructuras creadas en una corrida instrumentada."""
+    counters = Counters()
+    with instrument(algo, counters):
+        algo(list(entries))
+    return counters.as_dict()
+
+
+def profile_algorithms(entries, algorithms=ALGORITHMS):
+    profiles = {}
+    for name, algo in algorithms.items():
+        profiles[name] = {**measure_memory(algo, entries), **count_operations(algo, entries)}
+        print(f"{name}: perfil listo")
+    return profiles
+
+
+# ---------------- Reporte ----------------
+def _fmt(value):
+    return "-" if value is None else f"{value:,}"
+
+
+def print_report(profiles, timings=None):
+    """Tabla con tiempo (si se pasa), memoria y conteos de cada algoritmo."""
+    timings = timings or {}
+    header = (f"{'Algoritmo':<20} {'Tiempo (s)':>11} {'Pico (KiB)':>11} {'Retenida (KiB)':>15} "
+              f"{'Comparaciones':>14} {'Swaps':>11} {'Movimientos':>13} {'Copias':>13} {'Estructuras':>12}")
+    print(header)
+    print("-" * len(header))
+    for name, p in profiles.items():
+        elapsed = timings.get(name)
+        print(f"{name:<20} {'-' if elapsed is None else f'{elapsed:.6f}':>11} "
+              f"{p['peak_bytes'] / 1024:>11.1f} {p['retained_bytes'] / 1024:>15.1f} "
+              f"{_fmt(p['comparisons']):>14} {_fmt(p['swaps']):>11} {_fmt(p['moves']):>13} "
+              f"{_fmt(p['copies']):>13} {_fmt(p['allocations']):>12}")
+    print()
+    for label, method in zip(("Comparaciones", "Swaps", "Movimientos", "Copias", "Estructuras"), METRICS.values()):
+        print(f"  {label}: {method}")
+
+
+def plot_profile(profiles, save_path):
+    """Pico de memoria, comparaciones y movimientos+copias por algoritmo (escala log)."""
+    names = list(profiles)
+    panels = [
+        ("Pico de memoria (KiB)", [profiles[n]["peak_bytes"] / 1024 for n in names], "salmon"),
+        ("Comparaciones", [profiles[n]["comparisons"] or 0 for n in names], "skyblue"),
+        ("Movimientos + copias", [(profiles[n]["moves"] or 0) + (profiles[n]["copies"] or 0) for n in names],
+         "mediumseagreen"),
+    ]
+    fig, axes = plt.subplots(len(panels), 1, figsize=(12, 11), sharex=True)
+    for ax, (title, values, color) in zip(axes, panels):
+        ax.bar(names, values, color=color)
+        ax.set_yscale("log")
+        ax.set_ylabel(title)
+    axes[0].set_title("Perfil de memoria y operaciones por algoritmo")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Gráfica guardada en {save_path}")
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    SAMPLE_SIZE = 2000  # los algoritmos cuadráticos instrumentados son lentos con el corpus entero
+    entries = get_entries(INPUT)
+    if len(entries) > SAMPLE_SIZE:
+        entries = random.Random(42).sample(entries, SAMPLE_SIZE)
+    timings = benchmark(entries)
+    profiles = profile_algorithms(entries)
+    print_report(profiles, timings)
+    plot_profile(profiles, "./files/benchmark_profile.png")
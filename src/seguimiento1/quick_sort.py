@@ -1,82 +1,80 @@
+import heapq
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"[{}]", "", text)              # quitar llaves
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)    # quitar comandos LaTeX
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-
-# ---------------- Comparador ----------------
-def compare(entry1, entry2):
-    year1, year2 = int(entry1.get("year", 0)), int(entry2.get("year", 0))
-    if year1 < year2:
-        return -1
-    elif year1 > year2:
-        return 1
-    else:
-        title1 = normalize(entry1.get("title", ""))
-        title2 = normalize(entry2.get("title", ""))
-        if title1 < title2:
-            return -1
-        elif title1 > title2:
-            return 1
-        else:
-            return 0
+from corpus_cache import load_corpus
+from sort_keys import build_keys, compare_keys, index_list, apply_order
 
 
 # ---------------- QuickSort ----------------
-def quick_sort(entries):
-    if len(entries) <= 1:
-        return entries
+# Quicksort de 3 vías con pila explícita (sin recursión) y límite de profundidad
+# al estilo introsort: si un segmento se parte más de 2·log2(n) veces (pivotes
+# malos), se termina con heapsort y el peor caso queda en O(n log n).
+# Las particiones conservan el orden relativo, así que el resultado es estable.
+
+def heap_sort_segment(segment, keys):
+    """Heapsort de respaldo. Desempata por índice: mismo resultado que el orden estable."""
+    heap = [(keys[i], i) for i in segment]
+    heapq.heapify(heap)
+    return [heapq.heappop(heap)[1] for _ in range(len(heap))]
+
+
+def quick_sort_indices(indices, keys, depth_limit=None):
+    if depth_limit is None:
+        depth_limit = 2 * max(len(indices), 1).bit_length()
+
+    result = index_list()
+    stack = [(indices, 0, False)]  # (segmento, profundidad, ya ordenado)
+
+    while stack:
+        segment, depth, done = stack.pop()
+        if done or len(segment) <= 1:
+            result.extend(segment)
+            continue
+        if depth >= depth_limit:
+            result.extend(heap_sort_segment(segment, keys))
+            continue
+
+        pivot = keys[segment[len(segment) // 2]]  # pivote al centro
+        left, middle, right = index_list(), index_list(), index_list()
+
+        for i in segment:
+            cmp = compare_keys(keys[i], pivot)
+            if cmp < 0:
+                left.append(i)
+            elif cmp > 0:
+                right.append(i)
+            else:
+                middle.append(i)
+
+        # Se apilan al revés para que salga primero la parte izquierda
+        stack.append((right, depth + 1, False))
+        stack.append((middle, depth, True))
+        stack.append((left, depth + 1, False))
+
+    return result
 
-    pivot = entries[len(entries) // 2]  # pivote al centro
-    left, middle, right = [], [], []
 
-    for entry in entries:
-        cmp = compare(entry, pivot)
-        if cmp < 0:
-            left.append(entry)
-        elif cmp > 0:
-            right.append(entry)
-        else:
-            middle.append(entry)
-
-    return quick_sort(left) + middle + quick_sort(right)
+def quick_sort(entries):
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    order = quick_sort_indices(index_list(len(entries)), keys)
+    return apply_order(entries, order)
 
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = quick_sort(bib_database.entries)
+    sorted_rows = quick_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -86,7 +84,7 @@ def sort_bib_file(input_file, output_file):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (QuickSort): {elapsed:.6f} segundos")
-    print(f"📚 Total de entradas ordenadas: {len(sorted_entries)}")
+    print(f"📚 Total de entradas ordenadas: {len(sorted_rows)}")
 
 
 # ---------------- Ejecución directa ----------------
@@ -0,0 +1,380 @@
+import mmap
+import os
+import pickle
+import re
+import sys
+import time
+from array import array
+import numpy as np
+from bib_stream import iter_bib_entries
+from sort_keys import normalize
+
+
+# ---------------- Índice invertido para búsqueda de texto completo ----------------
+# Indexa title, abstract, keywords y author de cada entrada con el mismo texto
+# normalizado que se usa para ordenar (sin LaTeX, tildes ni mayúsculas). Los
+# campos se concatenan dejando un hueco de posiciones entre ellos, así una frase
+# no se arma con el final de un campo y el principio del siguiente.
+# Se guarda en un directorio junto al .bib (unificado.bib -> unificado.bib.idx/):
+#   postings.bin   tres secciones con las listas de todos los términos: IDs de
+#                  documento (en diferencias), frecuencias y posiciones (en
+#                  diferencias dentro de cada documento), como enteros varint
+#   lexicon.npy    una fila por término: df y (offset, largo) de cada segmento
+#   meta.pkl       términos, IDs/títulos/longitud de cada documento y la marca del .bib
+# Al consultar, postings.bin se abre con mmap y solo se decodifican (vectorizado
+# con NumPy) las listas de los términos de la consulta; no se vuelve a leer el .bib.
+# Consultas: términos, "frases", AND / OR / NOT y paréntesis (AND implícito),
+# y ranking BM25 de los resultados.
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+FIELDS = ("title", "abstract", "keywords", "author")
+FIELD_GAP = 100          # hueco de posiciones entre campos
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\()|(\))|([^\s()"]+)')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+# columnas de lexicon.npy
+_DF, _DOCS_OFFSET, _DOCS_LEN, _TFS_OFFSET, _TFS_LEN, _POS_OFFSET, _POS_LEN = range(7)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text or ""))
+
+
+# ---------------- Varint vectorizado ----------------
+def varint_sizes(values):
+    """Bytes que ocupa cada entero en varint."""
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    return nbytes
+
+
+def varint_encode(values):
+    """Enteros no negativos -> (bytes, tamaño de cada entero), 7 bits por byte (el bit alto indica que sigue otro)."""
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = varint_sizes(values)
+    starts = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max(initial=0))):
+        sel = nbytes > k
+        chunk = (values[sel] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = np.where(nbytes[sel] - 1 > k, 0x80, 0).astype(np.uint64)
+        out[starts[sel] + k] = (chunk | more).astype(np.uint8)
+    return out.tobytes(), nbytes
+
+
+def varint_decode(buffer):
+    """bytes (o memoryview) -> array int64 con los enteros codificados."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if not len(data):
+        return np.empty(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # desplazamiento de cada byte dentro de su entero: 0, 7, 14, ...
+    shifts = 7 * (np.arange(len(data)) - np.repeat(starts, ends - starts + 1))
+    parts = (data & 0x7F).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts)
+
+
+# ---------------- Construcción ----------------
+def index_path(bib_file):
+    return bib_file + INDEX_SUFFIX
+
+
+def _source_stamp(bib_file):
+    stat = os.stat(bib_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_index(bib_file, index_dir=None):
+    """Lee el .bib en streaming, arma el índice y lo escribe en index_dir. Devuelve su ruta."""
+    index_dir = index_dir or index_path(bib_file)
+    postings = {}  # término -> (docs, tfs, posiciones) en arrays
+    ids, titles = [], []
+    lengths = array("i")
+
+    for doc, entry in enumerate(iter_bib_entries(bib_file)):
+        ids.append(entry.get("ID", ""))
+        titles.append(entry.get("title", ""))
+        positions = {}
+        pos = 0
+        for field in FIELDS:
+            tokens = tokenize(entry.get(field))
+            for offset, token in enumerate(tokens):
+                positions.setdefault(token, []).append(pos + offset)
+            pos += len(tokens) + FIELD_GAP
+        lengths.append(sum(len(p) for p in positions.values()))
+        for token, token_positions in positions.items():
+            lists = postings.get(token)
+            if lists is None:
+                lists = postings[token] = (array("i"), array("i"), array("i"))
+            lists[0].append(doc)
+            lists[1].append(len(token_positions))
+            lists[2].extend(token_positions)
+
+    # Todas las listas, término por término en orden, concatenadas en tres arrays;
+    # las diferencias y la codificación se hacen de una vez para todo el índice
+    terms = sorted(postings)
+    df = np.fromiter((len(postings[t][0]) for t in terms), dtype=np.int64, count=len(terms))
+    docs, tfs, positions = (
+        np.frombuffer(b"".join(postings[t][column].tobytes() for t in terms), dtype=np.int32).astype(np.int64)
+        for column in range(3)
+    )
+    del postings
+    doc_gaps = np.diff(docs, prepend=0)
+    term_first = np.cumsum(df) - df
+    doc_gaps[term_first] = docs[term_first]  # cada lista arranca desde su primer documento
+    pos_gaps = np.diff(positions, prepend=0)
+    doc_first = np.cumsum(tfs) - tfs
+    pos_gaps[doc_first] = positions[doc_first]  # las posiciones se reinician en cada documento
+    occurrences = np.add.reduceat(tfs, term_first) if len(terms) else df
+
+    lexicon = np.zeros((len(terms), 7), dtype=np.int64)
+    lexicon[:, _DF] = df
+    os.makedirs(index_dir, exist_ok=True)
+    tmp_postings = os.path.join(index_dir, "postings.bin.tmp")
+    with open(tmp_postings, "wb") as f:
+        offset = 0
+        # tres secciones: documentos, frecuencias y posiciones de todos los términos
+        for column, values, counts in ((_DOCS_OFFSET, doc_gaps, df), (_TFS_OFFSET, tfs, df),
+                                       (_POS_OFFSET, pos_gaps, occurrences)):
+            encoded, nbytes = varint_encode(values)
+            f.write(encoded)
+            ends = np.cumsum(nbytes)[np.cumsum(counts) - 1] if len(terms) else counts
+            lengths_in_bytes = np.diff(ends, prepend=0)
+            lexicon[:, column] = offset + ends - lengths_in_bytes
+            lexicon[:, column + 1] = lengths_in_bytes
+            offset += len(encoded)
+
+    # Escritura atómica de cada archivo, como la caché del corpus
+    os.replace(tmp_postings, os.path.join(index_dir, "postings.bin"))
+    with open(os.path.join(index_dir, "lexicon.npy.tmp"), "wb") as f:
+        np.save(f, lexicon)
+    os.replace(os.path.join(index_dir, "lexicon.npy.tmp"), os.path.join(index_dir, "lexicon.npy"))
+    meta = {"version": INDEX_VERSION, "source": _source_stamp(bib_file), "terms": terms,
+            "ids": ids, "titles": titles, "lengths": lengths}
+    with open(os.path.join(index_dir, "meta.pkl.tmp"), "wb") as f:
+        pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(os.path.join(index_dir, "meta.pkl.tmp"), os.path.join(index_dir, "meta.pkl"))
+    return index_dir
+
+
+# ---------------- Consulta ----------------
+class SearchIndex:
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, "meta.pkl"), "rb") as f:
+            meta = pickle.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Índice de otra versión: {index_dir}")
+        self.source = meta["source"]
+        self.terms = {term: row for row, term in enumerate(meta["terms"])}
+        self.ids = meta["ids"]
+        self.titles = meta["titles"]
+        self.lengths = np.frombuffer(meta["lengths"], dtype=np.int32).astype(np.float64)
+        self.avg_length = self.lengths.mean() if len(self.lengths) else 0.0
+        self.lexicon = np.load(os.path.join(index_dir, "lexicon.npy"), mmap_mode="r")
+        self._file = open(os.path.join(index_dir, "postings.bin"), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._postings = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def close(self):
+        if isinstance(self._postings, mmap.mmap):
+            self._postings.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _segment(self, row, column):
+        offset, length = self.lexicon[row, column], self.lexicon[row, column + 1]
+        return varint_decode(memoryview(self._postings)[offset:offset + length])
+
+    def postings(self, term):
+        """(docs, tfs) de un término ya normalizado; arrays vacíos si no está."""
+        row = self.terms.get(term)
+        if row is None:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.cumsum(self._segment(row, _DOCS_OFFSET)), self._segment(row, _TFS_OFFSET)
+
+    def positions(self, term):
+        """(doc, posición) de cada aparición del término, como dos arrays alineados."""
+        row = self.terms.get(term)
+        if row is None:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        docs, tfs = self.postings(term)
+        gaps = self._segment(row, _POS_OFFSET)
+        total = np.cumsum(gaps)
+        first = np.cumsum(tfs) - tfs
+        base = total[first] - gaps[first]
+        return np.repeat(docs, tfs), total - np.repeat(base, tfs)
+
+    # ---------- Booleanas y frases ----------
+    def term_docs(self, word):
+        tokens = tokenize(word)
+        if len(tokens) != 1:
+            return self.phrase_docs(tokens)
+        return self.postings(tokens[0])[0]
+
+    def phrase_docs(self, tokens):
+        """Documentos donde los tokens aparecen seguidos y en ese orden."""
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        keys = None
+        for i, token in enumerate(tokens):
+            docs, positions = self.positions(token)
+            start = positions - i  # posición donde empezaría la frase
+            valid = start >= 0
+            term_keys = (docs[valid] << 32) | start[valid]
+            keys = term_keys if keys is None else np.intersect1d(keys, term_keys, assume_unique=True)
+            if not len(keys):
+                break
+        return np.unique(keys >> 32)
+
+    def query_docs(self, query):
+        """Documentos (ordenados) que cumplen la consulta booleana."""
+        tokens = _parse_query(query)
+        docs, rest = self._or(tokens)
+        if rest:
+            raise ValueError(f"Consulta mal formada cerca de: {rest[0][1]}")
+        return docs
+
+    # gramática: or := and (OR and)* ; and := not (AND? not)* ; not := NOT not | átomo
+    def _or(self, tokens):
+        docs, tokens = self._and(tokens)
+        while tokens and tokens[0] == ("op", "OR"):
+            other, tokens = self._and(tokens[1:])
+            docs = np.union1d(docs, other)
+        return docs, tokens
+
+    def _and(self, tokens):
+        docs, tokens = self._not(tokens)
+        while tokens and tokens[0] not in (("op", "OR"), ("paren", ")")):
+            if tokens[0] == ("op", "AND"):
+                tokens = tokens[1:]
+            other, tokens = self._not(tokens)
+            docs = np.intersect1d(docs, other, assume_unique=True)
+        return docs, tokens
+
+    def _not(self, tokens):
+        if not tokens:
+            raise ValueError("Consulta incompleta")
+        if tokens[0] == ("op", "NOT"):
+            docs, tokens = self._not(tokens[1:])
+            return np.setdiff1d(np.arange(len(self)), docs, assume_unique=True), tokens
+        kind, value = tokens[0]
+        if kind == "paren" and value == "(":
+            docs, tokens = self._or(tokens[1:])
+            if not tokens or tokens[0] != ("paren", ")"):
+                raise ValueError("Falta cerrar un paréntesis")
+            return docs, tokens[1:]
+        if kind == "phrase":
+            return self.phrase_docs(tokenize(value)), tokens[1:]
+        if kind == "word":
+            return self.term_docs(value), tokens[1:]
+        raise ValueError(f"Consulta mal formada cerca de: {value}")
+
+    # ---------- Ranking ----------
+    def bm25(self, terms, docs):
+        """Puntaje BM25 de cada documento de docs (ordenado) para los términos dados."""
+        scores = np.zeros(len(docs))
+        n = len(self)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[docs] / (self.avg_length or 1.0))
+        for term in set(terms):
+            term_docs, tfs = self.postings(term)
+            if not len(term_docs):
+                continue
+            idf = np.log(1 + (n - len(term_docs) + 0.5) / (len(term_docs) + 0.5))
+            pos = np.searchsorted(term_docs, docs)
+            pos = np.minimum(pos, len(term_docs) - 1)
+            tf = np.where(term_docs[pos] == docs, tfs[pos], 0)
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query, k=10):
+        """Los k mejores resultados de la consulta: [(ID, puntaje, título)] por BM25."""
+        docs = self.query_docs(query)
+        terms = _positive_terms(_parse_query(query))
+        scores = self.bm25(terms, docs)
+        order = np.lexsort((docs, -scores))[:k]
+        return [(self.ids[d], float(scores[o]), self.titles[d]) for o, d in zip(order, docs[order])]
+
+
+def _parse_query(query):
+    tokens = []
+    for phrase, open_paren, close_paren, word in _QUERY_RE.findall(query):
+        if open_paren or close_paren:
+            tokens.append(("paren", open_paren or close_paren))
+        elif word in _OPERATORS:
+            tokens.append(("op", word))
+        elif word:
+            tokens.append(("word", word))
+        else:
+            tokens.append(("phrase", phrase))
+    return tokens
+
+
+def _positive_terms(tokens):
+    """Términos que suman al ranking: todos menos los negados (un término o un paréntesis)."""
+    terms = []
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if (kind, value) == ("op", "NOT"):
+            i += 1
+            depth = 0
+            while i < len(tokens):  # saltar el operando negado completo
+                if tokens[i] == ("paren", "("):
+                    depth += 1
+                elif tokens[i] == ("paren", ")"):
+                    depth -= 1
+                i += 1
+                if depth <= 0 and tokens[i - 1] != ("op", "NOT"):
+                    break
+            continue
+        if kind in ("word", "phrase"):
+            terms.extend(tokenize(value))
+        i += 1
+    return terms
+
+
+def open_index(bib_file):
+    """Abre el índice de bib_file; si no existe o el .bib cambió, lo reconstruye."""
+    path = index_path(bib_file)
+    try:
+        index = SearchIndex(path)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, KeyError):
+        index = None
+    if index is not None and index.source == _source_stamp(bib_file):
+        return index
+    if index is not None:
+        index.close()
+    return SearchIndex(build_index(bib_file, path))
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    QUERY = " ".join(sys.argv[1:]) or '"generative artificial intelligence" AND (education OR teaching) NOT medical'
+    start = time.perf_counter()
+    with open_index(INPUT) as index:
+        print(f"⏱️ Índice listo en {time.perf_counter() - start:.3f} segundos ({len(index.terms)} términos)")
+        start = time.perf_counter()
+        results = index.search(QUERY)
+        print(f"🔎 {QUERY}  ({len(index.query_docs(QUERY))} documentos, {time.perf_counter() - start:.4f} s)")
+        for entry_id, score, title in results:
+            print(f"{score:7.3f}  {entry_id}: {title}")
@@ -1,71 +1,39 @@
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    # eliminar llaves y comandos LaTeX
-    text = re.sub(r"[{}]", "", text)
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-# ---------------- Comparación entre entradas ----------------
-def compare(entry1, entry2) -> bool:
-    """
-    Retorna True si entry1 debe ir antes que entry2.
-    """
-    year1 = int(entry1.get("year", 0))
-    year2 = int(entry2.get("year", 0))
-
-    if year1 != year2:
-        return year1 < year2
-
-    title1 = normalize(entry1.get("title", ""))
-    title2 = normalize(entry2.get("title", ""))
-    return title1 <= title2
+from corpus_cache import load_corpus
+from sort_keys import build_keys, index_list, apply_order
 
 # ---------------- Algoritmo Selection Sort ----------------
 def selection_sort(entries):
-    n = len(entries)
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    order = index_list(len(entries))
+    n = len(order)
     for i in range(n):
         min_idx = i
         for j in range(i + 1, n):
-            if not compare(entries[min_idx], entries[j]):
+            # entry[min_idx] debe ir antes que entry[j] si su clave es <=
+            if not keys[order[min_idx]] <= keys[order[j]]:
                 min_idx = j
         # intercambiar si encontramos un mínimo más pequeño
         if min_idx != i:
-            entries[i], entries[min_idx] = entries[min_idx], entries[i]
-    return entries
+            order[i], order[min_idx] = order[min_idx], order[i]
+    return apply_order(entries, order)
 
 # ---------------- Función principal ----------------
 def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = selection_sort(bib_database.entries)
+    sorted_rows = selection_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -75,7 +43,7 @@ def sort_bib_file(input_file, output_file):
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
     print(f"⏱️ Tiempo de ordenamiento (Selection Sort): {elapsed:.6f} segundos")
-    print(f"📚 Entradas ordenadas: {len(sorted_entries)}")
+    print(f"📚 Entradas ordenadas: {len(sorted_rows)}")
 
 # ---------------- Ejecución directa ----------------
 if __name__ == "__main__":
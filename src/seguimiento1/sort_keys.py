@@ -0,0 +1,85 @@
+import re
+import sys
+import unicodedata
+from array import array
+
+
+# ---------------- Normalización de texto ----------------
+_BRACES_RE = re.compile(r"[{}]")
+_LATEX_CMD_RE = re.compile(r"\\[a-zA-Z]+\s*")
+
+
+def clean_latex_text(text: str) -> str:
+    if not text:
+        return ""
+    text = _BRACES_RE.sub("", text)       # quitar llaves
+    text = _LATEX_CMD_RE.sub("", text)    # quitar comandos LaTeX
+    return text
+
+def normalize(text: str) -> str:
+    text = clean_latex_text(text)
+    text = text.lower()
+    text = "".join(
+        c for c in unicodedata.normalize("NFD", text)
+        if unicodedata.category(c) != "Mn"
+    )
+    return text.strip()
+
+
+# ---------------- Claves de ordenamiento ----------------
+# Las filas livianas (Corpus.key_rows, las particiones de parallel_sort, las
+# entradas sintéticas del benchmark) traen su clave ya calculada en el campo
+# KEY_FIELD. La clave viaja con la fila (copias de la lista, pickle a otro
+# proceso) y se libera junto con ella: no hay ninguna tabla global de claves.
+# Las entradas completas que se escriben al .bib no llevan este campo.
+KEY_FIELD = "_key"
+
+def attach_keys(rows, keys):
+    """Guarda en cada fila su clave precalculada para que sort_key no vuelva a normalizar."""
+    for row, key in zip(rows, keys):
+        row[KEY_FIELD] = key
+    return rows
+
+def sort_key(entry):
+    """Clave (año, título normalizado) con la que se ordenan las entradas."""
+    key = entry.get(KEY_FIELD)
+    if key is not None:
+        return key
+    return int(entry.get("year", 0)), sys.intern(normalize(entry.get("title", "")))
+
+def build_keys(entries):
+    """
+    Calcula una sola vez la clave de cada entrada.
+    keys[i] corresponde a entries[i], así los algoritmos ordenan índices
+    y comparan tuplas en lugar de normalizar en cada comparación.
+    """
+    return [sort_key(entry) for entry in entries]
+
+def build_key_columns(entries):
+    """Igual que build_keys pero en columnas: años en un array compacto y títulos aparte."""
+    years = array("i")
+    titles = []
+    for entry in entries:
+        year, title = sort_key(entry)
+        years.append(year)
+        titles.append(title)
+    return years, titles
+
+def compare_keys(key1, key2):
+    """-1, 0 o 1 según el orden (año asc, título asc), como los compare() originales."""
+    if key1 < key2:
+        return -1
+    elif key1 > key2:
+        return 1
+    return 0
+
+def index_list(n=0):
+    """
+    Lista de índices 0..n-1 (vacía por defecto) sobre la que los algoritmos
+    reordenan. profiling.py la reemplaza por una lista que cuenta movimientos.
+    """
+    return list(range(n))
+
+def apply_order(entries, order):
+    """Reconstruye la lista de entradas a partir de una permutación de índices."""
+    return [entries[i] for i in order]
@@ -0,0 +1,242 @@
+import os
+import re
+import time
+from array import array
+from collections import Counter
+import numpy as np
+import matplotlib.pyplot as plt
+from bib_stream import iter_bib_entries
+from sort_keys import normalize
+
+
+# ---------------- Frecuencia de términos (keywords y abstracts) ----------------
+# Una sola pasada en streaming sobre el .bib arma dos matrices documento-término
+# dispersas en formato CSR (una fila por entrada):
+#   keywords   frases completas: IEEE las separa con ";" y ScienceDirect con ","
+#   abstract   palabras de 3+ letras sin stopwords
+# Todo normalizado igual que los títulos para ordenar (sin LaTeX, tildes ni mayúsculas).
+# Los términos de la fila d son indices[indptr[d]:indptr[d + 1]] con sus conteos en
+# data. Una vez armadas, los totales, las tendencias por año y las co-ocurrencias
+# salen de operaciones vectorizadas de NumPy (bincount, partition, productos de
+# matrices por bloques), sin recorrer dicts en Python.
+
+MIN_WORD_LENGTH = 3
+COOCCURRENCE_BLOCK = 4096  # filas por bloque al calcular co-ocurrencias
+
+STOPWORDS = frozenset("""
+    the and for with from that this these those are was were been being have has had
+    its their our which what when where who whom how than then also into onto over
+    under between among within without about across after before during through such
+    can could may might must shall should will would not but all any both each few more
+    most other some only own same very just using used use based study paper results
+    however while here there they them via upon one two three new well like
+    los las del por para con una uno que como más sus entre sobre este esta
+""".split())
+
+_KEYWORD_SPLIT_RE = re.compile(r"\s*;\s*")
+_WORD_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+
+def keyword_terms(text):
+    """Keywords normalizadas; separador ";" (IEEE) o "," (ScienceDirect)."""
+    if not text:
+        return []
+    parts = _KEYWORD_SPLIT_RE.split(text) if ";" in text else text.split(",")
+    return [term for term in (" ".join(normalize(part).split()) for part in parts) if term]
+
+
+def abstract_terms(text):
+    """Palabras normalizadas del abstract, sin stopwords ni palabras cortas."""
+    if not text:
+        return []
+    return [word for word in _WORD_RE.findall(normalize(text))
+            if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS]
+
+
+TOKENIZERS = {"keywords": keyword_terms, "abstract": abstract_terms}
+
+
+class TermMatrix:
+    """Matriz documento-término en CSR con el año de cada documento."""
+
+    def __init__(self, vocabulary, indptr, indices, data, years):
+        self.vocabulary = vocabulary                       # id -> término
+        self.ids = {term: i for i, term in enumerate(vocabulary)}
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.years = years
+
+    @property
+    def shape(self):
+        return len(self.indptr) - 1, len(self.vocabulary)
+
+    def _rows(self):
+        """Fila (documento) de cada valor no nulo."""
+        return np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+
+    # ---------- Totales ----------
+    def term_counts(self):
+        """Apariciones totales de cada término."""
+        return np.bincount(self.indices, weights=self.data, minlength=self.shape[1]).astype(np.int64)
+
+    def document_frequency(self):
+        """Documentos en los que aparece cada término."""
+        return np.bincount(self.indices, minlength=self.shape[1])
+
+    def top_terms(self, k=20, by_documents=False):
+        """[(término, valor)] de los k términos más frecuentes (desempate alfabético)."""
+        values = self.document_frequency() if by_documents else self.term_counts()
+        k = min(k, len(values))
+        if k == 0:
+            return []
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        candidates = np.flatnonzero(values >= threshold)  # empates incluidos
+        names = np.array([self.vocabulary[i] for i in candidates], dtype=object)
+        order = np.lexsort((names, -values[candidates]))[:k]
+        return [(self.vocabulary[i], int(values[i])) for i in candidates[order]]
+
+    # ---------- Tendencias por año ----------
+    def year_term_counts(self, term_ids):
+        """
+        (años, matriz años × términos) con las apariciones de term_ids en cada año.
+        Se suman los valores de las filas de cada año con un solo bincount.
+        """
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        years, year_index = np.unique(np.asarray(self.years), return_inverse=True)
+        column = np.full(self.shape[1], -1, dtype=np.int64)
+        column[term_ids] = np.arange(len(term_ids))
+        cols = column[self.indices]
+        keep = cols >= 0
+        cells = year_index[self._rows()[keep]] * len(term_ids) + cols[keep]
+        counts = np.bincount(cells, weights=self.data[keep], minlength=len(years) * len(term_ids))
+        return years, counts.reshape(len(years), len(term_ids)).astype(np.int64)
+
+    def trends(self, k=10):
+        """Tendencia por año de los k términos más frecuentes: (años, {término: conteos})."""
+        terms = [term for term, _ in self.top_terms(k)]
+        years, counts = self.year_term_counts([self.ids[t] for t in terms])
+        return years, {term: counts[:, j] for j, term in enumerate(terms)}
+
+    # ---------- Co-ocurrencias ----------
+    def cooccurrence(self, term_ids, block=COOCCURRENCE_BLOCK):
+        """
+        Matriz k × k con los documentos en los que aparecen juntos cada par de term_ids
+        (la diagonal es la frecuencia de documento). Se calcula como Xᵀ·X sobre la
+        matriz binaria documento × término restringida a term_ids, por bloques de
+        filas para no materializarla completa.
+        """
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        k = len(term_ids)
+        column = np.full(self.shape[1], -1, dtype=np.int64)
+        column[term_ids] = np.arange(k)
+        result = np.zeros((k, k), dtype=np.int64)
+        n_docs = self.shape[0]
+        for start in range(0, n_docs, block):
+            stop = min(start + block, n_docs)
+            lo, hi = self.indptr[start], self.indptr[stop]
+            cols = column[self.indices[lo:hi]]
+            keep = cols >= 0
+            rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))[keep]
+            dense = np.zeros((stop - start, k), dtype=np.float32)
+            dense[rows, cols[keep]] = 1.0
+            result += (dense.T @ dense).astype(np.int64)
+        return result
+
+    def top_pairs(self, k=10, candidates=100):
+        """Los k pares de términos que más aparecen juntos, entre los `candidates` más frecuentes."""
+        terms = [term for term, _ in self.top_terms(candidates, by_documents=True)]
+        matrix = self.cooccurrence([self.ids[t] for t in terms])
+        i, j = np.triu_indices(len(terms), 1)
+        values = matrix[i, j]
+        order = np.lexsort((j, i, -values))[:k]
+        return [(terms[i[o]], terms[j[o]], int(values[o])) for o in order if values[o] > 0]
+
+
+class _MatrixBuilder:
+    """Acumula filas CSR a medida que llegan los documentos."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.vocabulary = []
+        self.ids = {}
+        self.indptr = array("q", [0])
+        self.indices = array("q")
+        self.data = array("q")
+
+    def add(self, text):
+        counts = Counter()
+        for term in self.tokenizer(text):
+            term_id = self.ids.get(term)
+            if term_id is None:
+                term_id = self.ids[term] = len(self.vocabulary)
+                self.vocabulary.append(term)
+            counts[term_id] += 1
+        for term_id in sorted(counts):
+            self.indices.append(term_id)
+            self.data.append(counts[term_id])
+        self.indptr.append(len(self.indices))
+
+    def build(self, years):
+        return TermMatrix(self.vocabulary, np.frombuffer(self.indptr, dtype=np.int64),
+                          np.frombuffer(self.indices, dtype=np.int64),
+                          np.frombuffer(self.data, dtype=np.int64), np.frombuffer(years, dtype=np.int32))
+
+
+def build_term_matrices(entries, fields=tuple(TOKENIZERS)):
+    """{campo: TermMatrix} en una sola pasada sobre entries (cualquier iterable de dicts)."""
+    builders = {field: _MatrixBuilder(TOKENIZERS[field]) for field in fields}
+    years = array("i")
+    for entry in entries:
+        years.append(int(entry.get("year", 0)))
+        for field, builder in builders.items():
+            builder.add(entry.get(field))
+    return {field: builder.build(years) for field, builder in builders.items()}
+
+
+def term_matrices(input_file, fields=tuple(TOKENIZERS)):
+    """Matrices de términos de un .bib leyéndolo en streaming (sin cargarlo completo)."""
+    return build_term_matrices(iter_bib_entries(input_file), fields)
+
+
+# ---------------- Reporte ----------------
+def print_top_terms(matrices, top_n=15):
+    for field, matrix in matrices.items():
+        print(f"\n📊 Los {top_n} términos más frecuentes en {field} ({matrix.shape[1]} términos distintos):")
+        for term, count in matrix.top_terms(top_n):
+            print(f"{term}: {count}")
+
+
+def print_cooccurrences(matrix, top_n=10):
+    print(f"\n🔗 Los {top_n} pares de términos que más aparecen juntos:")
+    for term1, term2, count in matrix.top_pairs(top_n):
+        print(f"{term1} + {term2}: {count} documentos")
+
+
+def plot_trends(matrix, save_path, k=8):
+    """Apariciones por año de los k términos más frecuentes."""
+    years, series = matrix.trends(k)
+    plt.figure(figsize=(12, 6))
+    for term, counts in series.items():
+        plt.plot(years, counts, marker="o", label=term)
+    plt.xlabel("Año")
+    plt.ylabel("Apariciones")
+    plt.title(f"Tendencia de los {k} términos más frecuentes")
+    plt.legend(fontsize="small")
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path)
+    plt.close()
+    print(f"Gráfica guardada en {save_path}")
+
+
+# ---------- Main ----------
+if __name__ == "__main__":
+    INPUT = "unificado.bib"
+    start = time.perf_counter()
+    matrices = term_matrices(INPUT)
+    print(f"⏱️ Matrices construidas en {time.perf_counter() - start:.3f} segundos")
+    print_top_terms(matrices)
+    print_cooccurrences(matrices["keywords"])
+    plot_trends(matrices["keywords"], "./files/tendencia_keywords.png")
+    plot_trends(matrices["abstract"], "./files/tendencia_abstracts.png")
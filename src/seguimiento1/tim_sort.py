@@ -1,9 +1,9 @@
 # tim_sort.py
-import re
-import unicodedata
+import random
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
+from corpus_cache import load_corpus
+from sort_keys import build_keys, index_list, apply_order
 import time
 
 MIN_MERGE = 32
@@ -25,44 +25,18 @@ def calcMinRun(n):
     return n + r
 
 
-# ---------- Normalización ----------
-def clean_latex_text(s: str) -> str:
-    if not s:
-        return ""
-    s = str(s)
-    s = s.replace("{", "").replace("}", "")
-    s = re.sub(r'\\[a-zA-Z]+(?:\*?)\s*\{([^}]*)\}', r'\1', s)
-    s = re.sub(r'\\[\'`\^\"~=.]{1}([A-Za-z])', r'\1', s)
-    s = re.sub(r'\\+', '', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
-
-def remove_diacritics(s: str) -> str:
-    nkfd = unicodedata.normalize('NFKD', s)
-    return ''.join(ch for ch in nkfd if not unicodedata.combining(ch))
-
-def normalize_title_for_sort(entry) -> str:
-    raw = entry.get("title", "") or ""
-    cleaned = clean_latex_text(raw)
-    cleaned = remove_diacritics(cleaned)
-    cleaned = cleaned.strip().lower()
-    cleaned = re.sub(r'^[^0-9a-z]+', '', cleaned)
-    return cleaned
-
-def normalize_year_for_sort(entry) -> int:
-    raw = entry.get("year", "") or ""
-    m = re.search(r'(\d{4})', str(raw))
-    return int(m.group(1)) if m else 9999
-
-# ---------- Algoritmo TIMSORT ----------
-def timsort(entries):
+# ---------- Versión anterior: runs fijos de 32 ----------
+def timsort_fixed_runs(entries, keys=None):
     """
-    Ordena entries .bib por (year asc, title asc), usando algoritmo Timsort.
+    Ordena entries .bib por (year asc, title asc) partiendo en bloques fijos de
+    32 y fusionando de abajo hacia arriba. Se mantiene para comparar con timsort.
     """
     # Precalcular claves
+    if keys is None:
+        keys = build_keys(entries)
     wrapped = [
-        (entry, normalize_year_for_sort(entry), normalize_title_for_sort(entry), idx)
-        for idx, entry in enumerate(entries)
+        (entry, year, title, idx)
+        for idx, (entry, (year, title)) in enumerate(zip(entries, keys))
     ]
 
     MIN_RUN = 32
@@ -117,23 +91,375 @@ def timsort(entries):
 
     return [w[0] for w in wrapped]
 
+# ---------- TimSort con runs naturales y galloping ----------
+# Implementación al estilo de CPython (listsort) sobre una lista de índices:
+#   1. Se detectan runs naturales (ascendentes, o estrictamente descendentes que
+#      se invierten); los cortos se extienden a minrun con binary insertion sort.
+#   2. Los runs se apilan y se fusionan manteniendo los invariantes de la pila
+#      (|A| > |B| + |C| y |B| > |C|), con la corrección de 2015 que revisa también
+#      el cuarto run desde arriba.
+#   3. Las fusiones entran en modo galloping cuando un lado gana MIN_GALLOP veces
+#      seguidas: se busca con búsqueda exponencial cuántos elementos pasan de
+#      golpe y se copian en bloque.
+# Sobre el corpus unificado (páginas ya agrupadas por año) los runs son largos y
+# el costo queda cerca de lineal.
+
+MIN_GALLOP = 7
+
+
+def gallop_left(key, arr, base, n, hint, keys):
+    """
+    Posición k en [0, n] tal que keys[arr[base + k - 1]] < key <= keys[arr[base + k]],
+    buscando de forma exponencial desde hint y terminando con búsqueda binaria.
+    """
+    last_ofs, ofs = 0, 1
+    if keys[arr[base + hint]] < key:
+        # a la derecha de hint: arr[hint + last_ofs] < key <= arr[hint + ofs]
+        max_ofs = n - hint
+        while ofs < max_ofs and keys[arr[base + hint + ofs]] < key:
+            last_ofs, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs, ofs = last_ofs + hint, ofs + hint
+    else:
+        # a la izquierda de hint: arr[hint - ofs] < key <= arr[hint - last_ofs]
+        max_ofs = hint + 1
+        while ofs < max_ofs and not keys[arr[base + hint - ofs]] < key:
+            last_ofs, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs, ofs = hint - ofs, hint - last_ofs
+
+    last_ofs += 1
+    while last_ofs < ofs:
+        mid = (last_ofs + ofs) >> 1
+        if keys[arr[base + mid]] < key:
+            last_ofs = mid + 1
+        else:
+            ofs = mid
+    return ofs
+
+
+def gallop_right(key, arr, base, n, hint, keys):
+    """Como gallop_left pero k queda después de los iguales: arr[k - 1] <= key < arr[k]."""
+    last_ofs, ofs = 0, 1
+    if key < keys[arr[base + hint]]:
+        max_ofs = hint + 1
+        while ofs < max_ofs and key < keys[arr[base + hint - ofs]]:
+            last_ofs, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs, ofs = hint - ofs, hint - last_ofs
+    else:
+        max_ofs = n - hint
+        while ofs < max_ofs and not key < keys[arr[base + hint + ofs]]:
+            last_ofs, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last_ofs, ofs = last_ofs + hint, ofs + hint
+
+    last_ofs += 1
+    while last_ofs < ofs:
+        mid = (last_ofs + ofs) >> 1
+        if key < keys[arr[base + mid]]:
+            ofs = mid
+        else:
+            last_ofs = mid + 1
+    return ofs
+
+
+def binary_insertion_sort(arr, lo, hi, start, keys):
+    """Extiende el run ordenado arr[lo:start] hasta hi (estable: inserta después de los iguales)."""
+    for i in range(start, hi):
+        pivot = arr[i]
+        pivot_key = keys[pivot]
+        left, right = lo, i
+        while left < right:
+            mid = (left + right) >> 1
+            if pivot_key < keys[arr[mid]]:
+                right = mid
+            else:
+                left = mid + 1
+        arr[left + 1:i + 1] = arr[left:i]
+        arr[left] = pivot
+
+
+def count_run(arr, lo, hi, keys):
+    """Largo del run natural que empieza en lo; si es descendente lo invierte."""
+    run = lo + 1
+    if run == hi:
+        return 1
+    if keys[arr[run]] < keys[arr[lo]]:
+        # estrictamente descendente (con iguales se rompería la estabilidad al invertir)
+        while run + 1 < hi and keys[arr[run + 1]] < keys[arr[run]]:
+            run += 1
+        arr[lo:run + 1] = arr[lo:run + 1][::-1]
+    else:
+        while run + 1 < hi and not keys[arr[run + 1]] < keys[arr[run]]:
+            run += 1
+    return run + 1 - lo
+
+
+class MergeState:
+    __slots__ = ("arr", "keys", "runs", "min_gallop")
+
+    def __init__(self, arr, keys):
+        self.arr = arr
+        self.keys = keys
+        self.runs = []  # pila de [inicio, largo]
+        self.min_gallop = MIN_GALLOP
+
+    def merge_collapse(self):
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+               (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+                self.merge_at(n)
+            elif runs[n][1] <= runs[n + 1][1]:
+                self.merge_at(n)
+            else:
+                break
+
+    def merge_force_collapse(self):
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+            self.merge_at(n)
+
+    def merge_at(self, i):
+        arr, keys, runs = self.arr, self.keys, self.runs
+        base1, len1 = runs[i]
+        base2, len2 = runs[i + 1]
+        runs[i] = [base1, len1 + len2]
+        del runs[i + 1]
+
+        # Lo que del run 1 ya va antes que todo el run 2 queda en su lugar
+        k = gallop_right(keys[arr[base2]], arr, base1, len1, 0, keys)
+        base1 += k
+        len1 -= k
+        if len1 == 0:
+            return
+        # Lo que del run 2 ya va después de todo el run 1 también
+        len2 = gallop_left(keys[arr[base1 + len1 - 1]], arr, base2, len2, len2 - 1, keys)
+        if len2 == 0:
+            return
+
+        if len1 <= len2:
+            self.merge_lo(base1, len1, base2, len2)
+        else:
+            self.merge_hi(base1, len1, base2, len2)
+
+    def merge_lo(self, base1, len1, base2, len2):
+        """Fusiona copiando el run 1 (el más corto) a un temporal y llenando desde la izquierda."""
+        arr, keys = self.arr, self.keys
+        tmp = arr[base1:base1 + len1]
+        i, j, dest = 0, base2, base1
+        end2 = base2 + len2
+        min_gallop = self.min_gallop
+
+        while i < len1 and j < end2:
+            count1 = count2 = 0
+            # Modo uno a uno hasta que un lado gane min_gallop veces seguidas
+            while i < len1 and j < end2:
+                if keys[arr[j]] < keys[tmp[i]]:
+                    arr[dest] = arr[j]
+                    j += 1
+                    count2 += 1
+                    count1 = 0
+                else:
+                    arr[dest] = tmp[i]
+                    i += 1
+                    count1 += 1
+                    count2 = 0
+                dest += 1
+                if count1 >= min_gallop or count2 >= min_gallop:
+                    break
+            else:
+                break
+
+            # Modo galloping
+            min_gallop += 1
+            while i < len1 and j < end2:
+                min_gallop -= min_gallop > 1
+                count1 = gallop_right(keys[arr[j]], tmp, i, len1 - i, 0, keys)
+                if count1:
+                    arr[dest:dest + count1] = tmp[i:i + count1]
+                    dest += count1
+                    i += count1
+                    if i == len1:
+                        break
+                arr[dest] = arr[j]
+                dest += 1
+                j += 1
+                if j == end2:
+                    break
+
+                count2 = gallop_left(keys[tmp[i]], arr, j, end2 - j, 0, keys)
+                if count2:
+                    arr[dest:dest + count2] = arr[j:j + count2]
+                    dest += count2
+                    j += count2
+                    if j == end2:
+                        break
+                arr[dest] = tmp[i]
+                dest += 1
+                i += 1
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    break
+            min_gallop += 1  # penalizar la salida del modo galloping
+
+        # Lo que quede del temporal va al final (lo que quede del run 2 ya está en su lugar)
+        if i < len1:
+            arr[dest:dest + len1 - i] = tmp[i:]
+        self.min_gallop = max(1, min_gallop)
+
+    def merge_hi(self, base1, len1, base2, len2):
+        """Fusiona copiando el run 2 (el más corto) a un temporal y llenando desde la derecha."""
+        arr, keys = self.arr, self.keys
+        tmp = arr[base2:base2 + len2]
+        i = base1 + len1 - 1  # último del run 1 (en arr)
+        j = len2 - 1          # último del run 2 (en tmp)
+        dest = base2 + len2 - 1
+        min_gallop = self.min_gallop
+
+        while i >= base1 and j >= 0:
+            count1 = count2 = 0
+            while i >= base1 and j >= 0:
+                if keys[tmp[j]] < keys[arr[i]]:
+                    arr[dest] = arr[i]
+                    i -= 1
+                    count1 += 1
+                    count2 = 0
+                else:
+                    arr[dest] = tmp[j]
+                    j -= 1
+                    count2 += 1
+                    count1 = 0
+                dest -= 1
+                if count1 >= min_gallop or count2 >= min_gallop:
+                    break
+            else:
+                break
+
+            min_gallop += 1
+            while i >= base1 and j >= 0:
+                min_gallop -= min_gallop > 1
+                # elementos del run 1 mayores que tmp[j]: van todos a su derecha
+                remaining1 = i - base1 + 1
+                count1 = remaining1 - gallop_right(keys[tmp[j]], arr, base1, remaining1, remaining1 - 1, keys)
+                if count1:
+                    arr[dest - count1 + 1:dest + 1] = arr[i - count1 + 1:i + 1]
+                    dest -= count1
+                    i -= count1
+                    if i < base1:
+                        break
+                arr[dest] = tmp[j]
+                dest -= 1
+                j -= 1
+                if j < 0:
+                    break
+
+                # elementos del run 2 mayores o iguales que arr[i]
+                count2 = j + 1 - gallop_left(keys[arr[i]], tmp, 0, j + 1, j, keys)
+                if count2:
+                    arr[dest - count2 + 1:dest + 1] = tmp[j - count2 + 1:j + 1]
+                    dest -= count2
+                    j -= count2
+                    if j < 0:
+                        break
+                arr[dest] = arr[i]
+                dest -= 1
+                i -= 1
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    break
+            min_gallop += 1
+
+        # Lo que quede del temporal va al principio
+        if j >= 0:
+            arr[dest - j:dest + 1] = tmp[:j + 1]
+        self.min_gallop = max(1, min_gallop)
+
+
+def timsort_indices(order, keys):
+    """Ordena in-place (y estable) la lista de índices order según keys."""
+    n = len(order)
+    if n < 2:
+        return order
+
+    state = MergeState(order, keys)
+    min_run = calcMinRun(n)
+    lo = 0
+    while lo < n:
+        run_len = count_run(order, lo, n, keys)
+        if run_len < min_run:
+            forced = min(min_run, n - lo)
+            binary_insertion_sort(order, lo, lo + forced, lo + run_len, keys)
+            run_len = forced
+        state.runs.append([lo, run_len])
+        state.merge_collapse()
+        lo += run_len
+    state.merge_force_collapse()
+    return order
+
+
+def timsort(entries, keys=None):
+    """
+    Ordena entries .bib por (year asc, title asc) con TimSort (runs naturales,
+    pila de runs y galloping). Mismas claves y mismo resultado que timsort_fixed_runs.
+    Las claves son las de sort_keys (build_keys usa la precalculada de cada fila),
+    igual que en los demás algoritmos.
+    """
+    if keys is None:
+        keys = build_keys(entries)
+    order = timsort_indices(index_list(len(entries)), keys)
+    return apply_order(entries, order)
+
+
+def compare_with_fixed_runs(entries, repetitions=3):
+    """
+    Tiempos (mejor de N) de la versión anterior y la nueva sobre varias formas de
+    entrada. Las claves se calculan antes, así se compara solo el ordenamiento.
+    """
+    shuffled = list(entries)
+    random.Random(42).shuffle(shuffled)
+    ordered = timsort(entries)
+    inputs = {
+        "orden del archivo": list(entries),
+        "aleatorio": shuffled,
+        "ya ordenado": ordered,
+        "invertido": ordered[::-1],
+    }
+    for label, data in inputs.items():
+        keys = build_keys(data)
+        times = {}
+        for name, algo in (("runs fijos", timsort_fixed_runs), ("TimSort real", timsort)):
+            best = float("inf")
+            for _ in range(repetitions):
+                start = time.perf_counter()
+                algo(data, keys)
+                best = min(best, time.perf_counter() - start)
+            times[name] = best
+        print(f"{label:>18}: runs fijos {times['runs fijos']:.6f} s | TimSort real {times['TimSort real']:.6f} s "
+              f"({times['runs fijos'] / times['TimSort real']:.1f}x)")
+
+
 # ---------- Función principal ----------
 def sort_bib_file(input_file, output_file):
     # Leer archivo .bib
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # Ordenar entradas con timsort
 
     start = time.perf_counter()
-    sorted_entries = timsort(bib_database.entries)
+    sorted_rows = timsort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # Guardar en nuevo archivo .bib
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "  # formato más legible
@@ -143,10 +469,11 @@ def sort_bib_file(input_file, output_file):
 
         print(f"✅ Archivo ordenado guardado en {output_file}")
         print(f"⏱️ Tiempo de ordenamiento: {elapsed:.6f} segundos")
-        print(f"📚 Entradas ordenadas: {len(sorted_entries)}")
+        print(f"📚 Entradas ordenadas: {len(sorted_rows)}")
 
 # ---------- Ejecución ----------
 if __name__ == "__main__":
     INPUT = "unificado.bib"
     OUTPUT = "./files/unificado_ordenado_timsort.bib"
     sort_bib_file(INPUT, OUTPUT)
+    compare_with_fixed_runs(load_corpus(INPUT).key_rows())
@@ -1,31 +1,48 @@
 import os
-import bibtexparser
-from bibtexparser.bparser import BibTexParser
+from corpus_cache import load_corpus
 from collections import Counter
+from author_index import AuthorIndex, index_path, normalize_author, source_stamp, top_k, update_author_index
+from author_names import load_aliases
 import matplotlib.pyplot as plt
 
-def normalize_author(name):
-    """Convertir a minúsculas y quitar espacios extra para uniformizar nombres."""
-    return " ".join(name.lower().strip().split())
+def corpus_records(corpus):
+    """Registros (ID, autores normalizados) de cada fila del corpus, para el índice de autores."""
+    normalized = {}
+    for name in corpus.authors:
+        if name not in normalized:
+            normalized[name] = normalize_author(name)  # cada nombre distinto se normaliza una vez
+    return [
+        (entry_id, tuple(normalized[name] for name in corpus.entry_authors(i)))
+        for i, entry_id in enumerate(corpus.ids)
+    ]
 
-def top_authors(input_file, top_n=15, save_path=None):
-    # Leer archivo .bib
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+def load_author_index(input_file):
+    """
+    Índice de autores de input_file (ver author_index.py). Si merge_bib_files ya lo
+    dejó al día no se lee el .bib; si falta o el .bib cambió, se sincroniza con el corpus.
+    """
+    index = AuthorIndex.load(index_path(input_file))
+    if index.source != source_stamp(input_file):
+        index, _, _ = update_author_index(input_file, corpus_records(load_corpus(input_file)))
+    return index
 
-    # Contar autores normalizados
-    author_counter = Counter()
-    for entry in bib_database.entries:
-        if "author" in entry:
-            authors = [normalize_author(a) for a in entry["author"].split(" and ")]
-            author_counter.update(authors)
+def canonical_counts(input_file, counts):
+    """Suma las apariciones de las variantes de cada autor bajo su nombre canónico (ver author_names.py)."""
+    aliases = load_aliases(input_file, counts)
+    canonical = Counter()
+    for name, count in counts.items():
+        if name in aliases:  # los nombres vacíos no tienen alias: no se cuentan
+            canonical[aliases[name]] += count
+    return canonical
 
-    # Ordenar descendente por número de apariciones (lógica intacta)
-    sorted_authors = sorted(author_counter.items(), key=lambda x: (-x[1], x[0]))
-
-    # Seleccionar los top N
-    top_authors_list = sorted_authors[:top_n]
+def top_authors(input_file, top_n=15, save_path=None, canonical=True):
+    # Top N desde el índice persistente: descendente por apariciones y desempate
+    # alfabético (misma lógica que ordenar todo y cortar), pero con un heap de tamaño N.
+    # Con canonical=True "Zhang, Jing", "J. Zhang" y "Jing Zhang" cuentan como un solo autor
+    counts = load_author_index(input_file).counts
+    if canonical:
+        counts = canonical_counts(input_file, counts)
+    top_authors_list = top_k(counts, top_n)
 
     # Mostrar resultado
     print(f"📊 Los {top_n} autores con más apariciones:")
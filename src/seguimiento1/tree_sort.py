@@ -1,87 +1,166 @@
 import time
-import re
-import unicodedata
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
-
-# ---------------- Normalización de texto ----------------
-def clean_latex_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"[{}]", "", text)              # quitar llaves
-    text = re.sub(r"\\[a-zA-Z]+\s*", "", text)    # quitar comandos LaTeX
-    return text
-
-def normalize(text: str) -> str:
-    text = clean_latex_text(text)
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text)
-        if unicodedata.category(c) != "Mn"
-    )
-    return text.strip()
-
-# ---------------- Comparación entre entradas ----------------
-def compare(entry1, entry2) -> bool:
-    """True si entry1 debe ir antes que entry2"""
-    year1 = int(entry1.get("year", 0))
-    year2 = int(entry2.get("year", 0))
-
-    if year1 != year2:
-        return year1 < year2
-
-    title1 = normalize(entry1.get("title", ""))
-    title2 = normalize(entry2.get("title", ""))
-    return title1 <= title2
+from corpus_cache import load_corpus
+from sort_keys import build_keys
 
 # ---------------- Definición del BST ----------------
 class Node:
-    def __init__(self, entry):
+    def __init__(self, entry, key):
         self.entry = entry
+        self.key = key
         self.left = None
         self.right = None
 
-def insert(root, entry):
+def insert(root, entry, key):
+    """Inserta iterativamente (un árbol degenerado no agota la pila de Python)."""
+    node = Node(entry, key)
     if root is None:
-        return Node(entry)
-    if compare(entry, root.entry):
-        root.left = insert(root.left, entry)
-    else:
-        root.right = insert(root.right, entry)
-    return root
+        return node
+    current = root
+    while True:
+        if key <= current.key:  # entry debe ir antes que current.entry
+            if current.left is None:
+                current.left = node
+                return root
+            current = current.left
+        else:
+            if current.right is None:
+                current.right = node
+                return root
+            current = current.right
 
 def inorder_traversal(root, result):
-    if root is not None:
-        inorder_traversal(root.left, result)
-        result.append(root.entry)
-        inorder_traversal(root.right, result)
+    """Recorrido in-order con pila explícita."""
+    stack = []
+    node = root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        result.append(node.entry)
+        node = node.right
+
+# ---------------- Árbol AVL (balanceado) ----------------
+# Mismo criterio de orden que el BST (clave <= nodo va a la izquierda) y las
+# rotaciones no cambian el recorrido in-order, así que el resultado es idéntico
+# al de tree_sort; la altura queda en O(log n) aunque la entrada venga ordenada.
+class AVLNode:
+    __slots__ = ("entry", "key", "left", "right", "height")
+
+    def __init__(self, entry, key):
+        self.entry = entry
+        self.key = key
+        self.left = None
+        self.right = None
+        self.height = 1
+
+def height(node):
+    return node.height if node is not None else 0
+
+def update_height(node):
+    node.height = 1 + max(height(node.left), height(node.right))
+
+def rotate_right(node):
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    update_height(node)
+    update_height(pivot)
+    return pivot
+
+def rotate_left(node):
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    update_height(node)
+    update_height(pivot)
+    return pivot
+
+def rebalance(node):
+    """Deja el subárbol con factor de balance en [-1, 1]; devuelve la nueva raíz."""
+    update_height(node)
+    balance = height(node.left) - height(node.right)
+    if balance > 1:
+        if height(node.left.left) < height(node.left.right):
+            node.left = rotate_left(node.left)
+        return rotate_right(node)
+    if balance < -1:
+        if height(node.right.right) < height(node.right.left):
+            node.right = rotate_right(node.right)
+        return rotate_left(node)
+    return node
+
+def avl_insert(root, entry, key):
+    """Inserta iterativamente y rebalancea el camino de vuelta; devuelve la nueva raíz."""
+    node = AVLNode(entry, key)
+    if root is None:
+        return node
+
+    path = []
+    current = root
+    while current is not None:
+        path.append(current)
+        current = current.left if key <= current.key else current.right
+    parent = path[-1]
+    if key <= parent.key:
+        parent.left = node
+    else:
+        parent.right = node
+
+    # Subir rebalanceando; se corta cuando la altura del subárbol no cambia
+    for depth in range(len(path) - 1, -1, -1):
+        current = path[depth]
+        old_height = current.height
+        subtree = rebalance(current)
+        if depth == 0:
+            return subtree
+        above = path[depth - 1]
+        if above.left is current:
+            above.left = subtree
+        else:
+            above.right = subtree
+        if subtree is current and current.height == old_height:
+            break
+    return root
 
 # ---------------- Algoritmo Tree Sort ----------------
 def tree_sort(entries):
+    keys = build_keys(entries)  # claves calculadas una sola vez
+    root = None
+    for entry, key in zip(entries, keys):
+        root = insert(root, entry, key)
+
+    result = []
+    inorder_traversal(root, result)
+    return result
+
+def avl_tree_sort(entries):
+    """Tree sort sobre un AVL: O(n log n) garantizado, mismo resultado que tree_sort."""
+    keys = build_keys(entries)  # claves calculadas una sola vez
     root = None
-    for entry in entries:
-        root = insert(root, entry)
+    for entry, key in zip(entries, keys):
+        root = avl_insert(root, entry, key)
 
     result = []
     inorder_traversal(root, result)
     return result
 
 # ---------------- Función principal ----------------
-def sort_bib_file(input_file, output_file):
-    parser = BibTexParser(common_strings=True)
-    with open(input_file, encoding="utf-8") as bibtex_file:
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+def sort_bib_file(input_file, output_file, balanced=True):
+    corpus = load_corpus(input_file)  # corpus en columnas (caché)
+    rows = corpus.key_rows()  # solo clave y número de fila; el resto se reconstruye al escribir
 
     # medir tiempo
     start = time.perf_counter()
-    sorted_entries = tree_sort(bib_database.entries)
+    sorted_rows = avl_tree_sort(rows) if balanced else tree_sort(rows)
     end = time.perf_counter()
     elapsed = end - start
 
     # guardar archivo
     db_sorted = bibtexparser.bibdatabase.BibDatabase()
-    db_sorted.entries = sorted_entries
+    db_sorted.entries = corpus.materialize_rows(sorted_rows)
 
     writer = BibTexWriter()
     writer.indent = "    "
@@ -90,8 +169,9 @@ def sort_bib_file(input_file, output_file):
         f.write(writer.write(db_sorted))
 
     print(f"✅ Archivo ordenado guardado en {output_file}")
-    print(f"⏱️ Tiempo de ordenamiento (Tree Sort): {elapsed:.6f} segundos")
-    print(f"📚 Entradas ordenadas: {len(sorted_entries)}")
+    label = "AVL Tree Sort" if balanced else "Tree Sort"
+    print(f"⏱️ Tiempo de ordenamiento ({label}): {elapsed:.6f} segundos")
+    print(f"📚 Entradas ordenadas: {len(sorted_rows)}")
 
 # ---------------- Ejecución directa ----------------
 if __name__ == "__main__":